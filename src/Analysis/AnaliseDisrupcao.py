@@ -1,34 +1,134 @@
 import pandas as pd
+import numpy as np
 import networkx as nx
 import os
 import matplotlib.pyplot as plt
+import argparse
+import heapq
+import time
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from CarregadorGrafo import carregar_grafo
 
-def simular_ataque(G_original, lista_alvos, nome_estrategia):
+#Orçamentos dos ataques adaptativos: quanto menor, mais rápido e menos preciso.
+#tol_pagerank: tolerância de convergência do PageRank (reiniciado a partir do vetor anterior)
+#amostras_betweenness: número de pivôs da betweenness amostrada (None = exata)
+ORCAMENTOS_ADAPTATIVOS = {
+    'rapido': {'tol_pagerank': 1e-4, 'amostras_betweenness': 64},
+    'equilibrado': {'tol_pagerank': 1e-6, 'amostras_betweenness': 256},
+    'preciso': {'tol_pagerank': 1e-8, 'amostras_betweenness': None}
+}
+
+ESTRATEGIAS_ADAPTATIVAS = {
+    'grau': 'Grau (Adaptativo)',
+    'pagerank': 'PageRank (Adaptativo)',
+    'betweenness': 'Betweenness Amostrada (Adaptativo)'
+}
+
+#Lista 3 do estudo (Elite Estrutural), usada quando nenhuma outra é informada
+ALVOS_ELITE_PADRAO = [
+    'kenneth.lay@enron.com',
+    'jeff.skilling@enron.com',
+    'tana.jones@enron.com',
+    'sally.beck@enron.com',
+    'louise.kitchen@enron.com',
+    'jeff.dasovich@enron.com'
+]
+
+def preparar_estrutura_componentes(G):
+    #Converte o grafo (ignorando a direção das arestas) em listas de adjacência com ids inteiros,
+    #usadas pelo cálculo incremental do componente gigante.
+    indice = {no: i for i, no in enumerate(G)}
+    vizinhos = [[] for _ in range(len(indice))]
+    for u, v in G.edges():
+        iu, iv = indice[u], indice[v]
+        if iu != iv:
+            vizinhos[iu].append(iv)
+            vizinhos[iv].append(iu)
+    return indice, vizinhos
+
+def tamanhos_componente_gigante(vizinhos, sequencia_remocao):
+    #Percolação reversa: em vez de remover os nós um a um e recalcular os componentes,
+    #parte do grafo sem todos os alvos e os reinsere em ordem inversa com union-find.
+    #Retorna o tamanho do componente gigante antes da primeira remoção e após cada uma delas
+    #(len(sequencia_remocao) + 1 valores), em tempo quase linear em V + E.
+    n = len(vizinhos)
+    pai = list(range(n))
+    tamanho = [1] * n
+    ativo = [True] * n
+    for no in sequencia_remocao:
+        ativo[no] = False
+
+    def encontrar(x):
+        while pai[x] != x:
+            pai[x] = pai[pai[x]]
+            x = pai[x]
+        return x
+
+    def ativar(no, maior):
+        raiz_no = encontrar(no)
+        for vizinho in vizinhos[no]:
+            if not ativo[vizinho]:
+                continue
+            raiz_vizinho = encontrar(vizinho)
+            if raiz_vizinho == raiz_no:
+                continue
+            if tamanho[raiz_no] < tamanho[raiz_vizinho]:
+                raiz_no, raiz_vizinho = raiz_vizinho, raiz_no
+            pai[raiz_vizinho] = raiz_no
+            tamanho[raiz_no] += tamanho[raiz_vizinho]
+        return max(maior, tamanho[raiz_no])
+
+    maior = 0
+    for no in range(n):
+        if ativo[no]:
+            ativo[no] = False
+            maior = ativar(no, maior)
+            ativo[no] = True
+
+    tamanhos = [maior]
+    for no in reversed(sequencia_remocao):
+        ativo[no] = True
+        maior = ativar(no, maior)
+        tamanhos.append(maior)
+
+    tamanhos.reverse()
+    return tamanhos
+
+def simular_ataque(G_original, lista_alvos, nome_estrategia, estrutura=None):
     #Remove nós da lista um a um e mede o tamanho do maior componente conectado.
+    #estrutura: resultado de preparar_estrutura_componentes(G_original), reaproveitável entre estratégias.
    
     print(f"--- Iniciando simulação: {nome_estrategia} ---")
-    
-    G = G_original.copy()
-    G_und = G.to_undirected()
-    
-    if len(G_und) > 0:
-        maior_componente_inicial = len(max(nx.connected_components(G_und), key=len))
-    else:
-        maior_componente_inicial = 0
+
+    if estrutura is None:
+        estrutura = preparar_estrutura_componentes(G_original)
+    indice, vizinhos = estrutura
+
+    #Alvos ausentes do grafo (ou já removidos) não alteram a integridade da rede
+    sequencia_remocao = []
+    removidos = set()
+    encontrados = []
+    for alvo in lista_alvos:
+        encontrado = alvo in indice and alvo not in removidos
+        encontrados.append(encontrado)
+        if encontrado:
+            removidos.add(alvo)
+            sequencia_remocao.append(indice[alvo])
+
+    tamanhos = tamanhos_componente_gigante(vizinhos, sequencia_remocao)
+    maior_componente_inicial = tamanhos[0]
         
     print(f"  Tamanho inicial: {maior_componente_inicial} nós")
     
     historico_integridade = [100.0]
+    passo = 0
     
-    for i, alvo in enumerate(lista_alvos):
-        if alvo in G:
-            G.remove_node(alvo)
-            if alvo in G_und:
-                G_und.remove_node(alvo)
-            
-            if len(G_und) > 0:
-                maior_componente = len(max(nx.connected_components(G_und), key=len))
-                porcentagem = (maior_componente / maior_componente_inicial) * 100
+    for alvo, encontrado in zip(lista_alvos, encontrados):
+        if encontrado:
+            passo += 1
+            if maior_componente_inicial > 0:
+                porcentagem = (tamanhos[passo] / maior_componente_inicial) * 100
             else:
                 porcentagem = 0.0
             
@@ -40,22 +140,158 @@ def simular_ataque(G_original, lista_alvos, nome_estrategia):
             
     return historico_integridade
 
-def executar_analise_disrupcao():
+#Listas de adjacência usadas pelos processos da linha de base aleatória (somente leitura)
+_vizinhos_compartilhados = None
+
+def _inicializar_trabalhador(vizinhos):
+    #Executado uma vez por processo: a estrutura é recebida na criação do processo,
+    #e não a cada lote de sequências
+    global _vizinhos_compartilhados
+    _vizinhos_compartilhados = vizinhos
+
+def _simular_lote_aleatorio(indices_sequencias, num_remocoes, seed):
+    #Cada sequência tem seu próprio gerador (seed, índice), então o resultado não depende
+    #de quantos processos foram usados nem de qual processo executou cada lote
+    vizinhos = _vizinhos_compartilhados
+    curvas = []
+    for indice in indices_sequencias:
+        rng = np.random.default_rng([seed, int(indice)])
+        sequencia = rng.choice(len(vizinhos), size=min(num_remocoes, len(vizinhos)), replace=False).tolist()
+        curvas.append(tamanhos_componente_gigante(vizinhos, sequencia))
+    return curvas
+
+def simular_falhas_aleatorias(estrutura, num_remocoes, num_sequencias=200, seed=42, workers=1):
+    #Linha de base de falhas aleatórias: remove num_remocoes nós sorteados, em num_sequencias
+    #ordens independentes. Retorna a matriz de integridade (%) com uma linha por sequência e
+    #num_remocoes + 1 colunas (a primeira é 100%).
+    _, vizinhos = estrutura
+    print(f"--- Iniciando simulação: Falhas Aleatórias ({num_sequencias} sequências de {num_remocoes} remoções, {workers} worker(s)) ---")
+    inicio = time.perf_counter()
+
+    lotes = np.array_split(np.arange(num_sequencias), max(1, min(num_sequencias, 4 * workers)))
+    if workers <= 1:
+        _inicializar_trabalhador(vizinhos)
+        resultados = [_simular_lote_aleatorio(lote, num_remocoes, seed) for lote in lotes]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_inicializar_trabalhador, initargs=(vizinhos,)) as executor:
+            resultados = list(executor.map(_simular_lote_aleatorio, lotes, repeat(num_remocoes), repeat(seed)))
+
+    tamanhos = np.array([curva for lote in resultados for curva in lote], dtype=float)
+    inicial = tamanhos[:, :1]
+    integridade = np.divide(100 * tamanhos, inicial, out=np.zeros_like(tamanhos), where=inicial > 0)
+
+    print(f"  {num_sequencias} sequências simuladas em {time.perf_counter() - inicio:.2f}s")
+    return integridade
+
+def resumir_integridade(integridade, nivel=0.95):
+    #Média e faixa central (percentis) das sequências aleatórias em cada passo
+    cauda = (1 - nivel) / 2 * 100
+    return pd.DataFrame({
+        'nos_removidos': np.arange(integridade.shape[1]),
+        'media': integridade.mean(axis=0),
+        'inferior': np.percentile(integridade, cauda, axis=0),
+        'superior': np.percentile(integridade, 100 - cauda, axis=0)
+    })
+
+def comparar_com_aleatorio(historico, integridade, nome_estrategia):
+    #Fração das sequências aleatórias com dano igual ou maior que o da estratégia, no mesmo número de remoções
+    passo = min(len(historico), integridade.shape[1]) - 1
+    aleatorio = integridade[:, passo]
+    fracao = (aleatorio <= historico[passo]).mean()
+    print(f"  {nome_estrategia}: {historico[passo]:.2f}% após {passo} remoções; "
+          f"aleatório {aleatorio.mean():.2f}% em média, {fracao:.1%} das sequências com dano igual ou maior.")
+
+def selecionar_alvos_adaptativos(G_original, estrategia, num_alvos, orcamento='equilibrado', seed=42):
+    #Ataque adaptativo: após cada remoção, o nó mais central do grafo restante é escolhido novamente.
+    #Retorna a sequência de alvos e o tempo (s) gasto para escolher cada um.
+    parametros = ORCAMENTOS_ADAPTATIVOS[orcamento]
+    G = G_original.copy()
+    alvos = []
+    tempos = []
+
+    if estrategia == 'grau':
+        #Heap com invalidação tardia: só os vizinhos do nó removido têm o grau alterado
+        ordem = {no: i for i, no in enumerate(G)}
+        heap = [(-G.degree(no), ordem[no], no) for no in G]
+        heapq.heapify(heap)
+
+    pagerank_anterior = None
+
+    for passo in range(min(num_alvos, len(G_original))):
+        inicio = time.perf_counter()
+
+        if estrategia == 'grau':
+            while True:
+                grau_negativo, _, alvo = heapq.heappop(heap)
+                if alvo in G and -grau_negativo == G.degree(alvo):
+                    break
+            vizinhos = set(G.predecessors(alvo)) | set(G.successors(alvo))
+            G.remove_node(alvo)
+            for vizinho in vizinhos:
+                if vizinho != alvo:
+                    heapq.heappush(heap, (-G.degree(vizinho), ordem[vizinho], vizinho))
+
+        elif estrategia == 'pagerank':
+            pagerank_anterior = nx.pagerank(
+                G, alpha=0.85, nstart=pagerank_anterior, tol=parametros['tol_pagerank']
+            )
+            alvo = max(pagerank_anterior, key=pagerank_anterior.get)
+            del pagerank_anterior[alvo]
+            G.remove_node(alvo)
+            if not pagerank_anterior:
+                pagerank_anterior = None
+
+        elif estrategia == 'betweenness':
+            k = parametros['amostras_betweenness']
+            if k is not None and k >= len(G):
+                k = None
+            betweenness = nx.betweenness_centrality(G, k=k, seed=seed + passo)
+            alvo = max(betweenness, key=betweenness.get)
+            G.remove_node(alvo)
+
+        else:
+            raise ValueError(f"Estratégia adaptativa desconhecida: '{estrategia}'. Opções: {list(ESTRATEGIAS_ADAPTATIVAS)}")
+
+        duracao = time.perf_counter() - inicio
+        alvos.append(alvo)
+        tempos.append(duracao)
+        print(f"    - Passo {passo + 1}: {alvo} selecionado em {duracao:.3f}s")
+
+    return alvos, tempos
+
+def simular_ataque_adaptativo(G_original, estrategia, num_alvos, orcamento='equilibrado', estrutura=None):
+    nome_estrategia = ESTRATEGIAS_ADAPTATIVAS.get(estrategia, estrategia)
+    print(f"--- Selecionando alvos adaptativos: {nome_estrategia} (orçamento '{orcamento}') ---")
+
+    alvos, tempos = selecionar_alvos_adaptativos(G_original, estrategia, num_alvos, orcamento)
+    if tempos:
+        print(f"  Tempo médio por passo: {sum(tempos) / len(tempos):.3f}s (total {sum(tempos):.2f}s)")
+
+    historico_integridade = simular_ataque(G_original, alvos, nome_estrategia, estrutura)
+    return historico_integridade, alvos, tempos
+
+def executar_analise_disrupcao(G=None, estrategias_adaptativas=(), num_alvos_adaptativos=10, orcamento='equilibrado', alvos_elite=None,
+                               sequencias_aleatorias=200, seed=42, workers=1):
+    #G: grafo já construído (opcional); se omitido, é obtido via CarregadorGrafo.
+    #estrategias_adaptativas: subconjunto de ESTRATEGIAS_ADAPTATIVAS, simuladas além das listas estáticas.
+    #alvos_elite: lista da Elite Estrutural (padrão: ALVOS_ELITE_PADRAO).
+    #sequencias_aleatorias: sequências da linha de base de falhas aleatórias (0 desativa).
     script_dir = os.path.dirname(os.path.abspath(__file__))
     root_dir = os.path.abspath(os.path.join(script_dir, '..', '..')) 
 
-    caminho_dados = os.path.join(root_dir, 'dataSets', 'Outputs', 'EnronEmailsTratados.csv')
+    caminho_saida_dir = os.path.join(root_dir, 'dataSets', 'Outputs')
     caminho_top10_betweenness = os.path.join(root_dir, 'dataSets', 'Outputs', 'top10_intermediarios.csv')
     caminho_top10_pagerank = os.path.join(root_dir, 'dataSets', 'Outputs', 'top10_pagerank.csv')
     caminho_saida_grafico = os.path.join(root_dir, 'dataSets', 'Outputs', 'analise_disrupcao.png')
+    caminho_saida_aleatorio = os.path.join(root_dir, 'dataSets', 'Outputs', 'disrupcao_aleatoria.csv')
 
-    print("Carregando grafo...")
-    try:
-        df = pd.read_csv(caminho_dados)
-        G = nx.from_pandas_edgelist(df, 'remetente', 'destinatario', create_using=nx.DiGraph())
-    except Exception as e:
-        print(f"Erro ao carregar grafo: {e}")
-        return
+    if G is None:
+        print("Carregando grafo...")
+        try:
+            G = carregar_grafo(caminho_saida_dir)
+        except Exception as e:
+            print(f"Erro ao carregar grafo: {e}")
+            return
 
     try:
         # Lista 1: Intermediários (Betweenness) -> Estratégia de Fragmentação
@@ -67,30 +303,59 @@ def executar_analise_disrupcao():
         alvos_autoridades = df_page.iloc[:, 0].tolist()
         
         # Lista 3: Elite Estrutural 
-        alvos_elite = [
-            'kenneth.lay@enron.com',
-            'jeff.skilling@enron.com',
-            'tana.jones@enron.com',
-            'sally.beck@enron.com',
-            'louise.kitchen@enron.com',
-            'jeff.dasovich@enron.com'   
-        ]
+        if alvos_elite is None:
+            alvos_elite = ALVOS_ELITE_PADRAO
         
     except Exception as e:
         print(f"Erro ao carregar listas: {e}")
         return
 
     # Simulações
-    res_brokers = simular_ataque(G, alvos_brokers, "Intermediários (Betweenness)")
-    res_autoridades = simular_ataque(G, alvos_autoridades, "Autoridades (PageRank)")
-    res_elite = simular_ataque(G, alvos_elite, "Elite Estrutural (Manual)")
+    estrutura = preparar_estrutura_componentes(G)
+    res_brokers = simular_ataque(G, alvos_brokers, "Intermediários (Betweenness)", estrutura)
+    res_autoridades = simular_ataque(G, alvos_autoridades, "Autoridades (PageRank)", estrutura)
+    res_elite = simular_ataque(G, alvos_elite, "Elite Estrutural (Manual)", estrutura)
+
+    res_adaptativos = {}
+    for estrategia in estrategias_adaptativas:
+        res_adaptativos[estrategia], _, _ = simular_ataque_adaptativo(
+            G, estrategia, num_alvos_adaptativos, orcamento, estrutura
+        )
+
+    #Linha de base: o mesmo número de remoções da maior lista, com nós sorteados
+    df_aleatorio = None
+    if sequencias_aleatorias > 0:
+        historicos = {
+            "Intermediários (Betweenness)": res_brokers,
+            "Autoridades (PageRank)": res_autoridades,
+            "Elite Estrutural (Manual)": res_elite
+        }
+        historicos.update({ESTRATEGIAS_ADAPTATIVAS[estrategia]: historico for estrategia, historico in res_adaptativos.items()})
+        num_remocoes = max(len(historico) for historico in historicos.values()) - 1
+
+        integridade = simular_falhas_aleatorias(estrutura, num_remocoes, sequencias_aleatorias, seed, workers)
+        for nome_estrategia, historico in historicos.items():
+            comparar_com_aleatorio(historico, integridade, nome_estrategia)
+
+        df_aleatorio = resumir_integridade(integridade)
+        df_aleatorio.to_csv(caminho_saida_aleatorio, index=False)
+        print(f"Curva média e faixa de 95% das falhas aleatórias salvas em: {caminho_saida_aleatorio}")
 
     print("Gerando gráfico...")
     plt.figure(figsize=(10, 6))
+
+    if df_aleatorio is not None:
+        plt.plot(df_aleatorio['nos_removidos'], df_aleatorio['media'], color='gray',
+                 label=f'Falhas Aleatórias (média de {sequencias_aleatorias})')
+        plt.fill_between(df_aleatorio['nos_removidos'], df_aleatorio['inferior'], df_aleatorio['superior'],
+                         color='gray', alpha=0.25, label='Falhas Aleatórias (faixa de 95%)')
     
     plt.plot(res_brokers, marker='o', color='red', label='Intermediários (Fragmentação)')
     plt.plot(res_autoridades, marker='s', color='blue', linestyle='--', label='Autoridades (Decapitação)')
     plt.plot(res_elite, marker='^', color='green', linestyle='-.', label='Elite Estrutural')
+
+    for estrategia, historico in res_adaptativos.items():
+        plt.plot(historico, marker='.', linestyle=':', label=ESTRATEGIAS_ADAPTATIVAS[estrategia])
     
     plt.title('Simulação de Disrupção da Rede: Comparação de Estratégias')
     plt.xlabel('Número de Nós Removidos')
@@ -102,4 +367,29 @@ def executar_analise_disrupcao():
     print(f"Gráfico salvo em: {caminho_saida_grafico}")
 
 if __name__ == "__main__":
-    executar_analise_disrupcao()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Simulação de disrupção da rede de e-mails.")
+    parser.add_argument('--adaptativo', nargs='+', default=[], choices=list(ESTRATEGIAS_ADAPTATIVAS),
+                        help="Estratégias adaptativas (centralidade recalculada após cada remoção).")
+    parser.add_argument('--num-alvos', type=int, default=10,
+                        help="Número de nós removidos nos ataques adaptativos.")
+    parser.add_argument('--orcamento', default='equilibrado', choices=list(ORCAMENTOS_ADAPTATIVOS),
+                        help="Troca precisão por velocidade nos ataques adaptativos.")
+    parser.add_argument('--alvos-elite', nargs='+', default=None, metavar='ENDERECO',
+                        help="Endereços da lista Elite Estrutural (padrão: lista manual do estudo).")
+    parser.add_argument('--sequencias-aleatorias', type=int, default=200,
+                        help="Sequências de remoção aleatória da linha de base (0 desativa).")
+    parser.add_argument('--seed', type=int, default=42,
+                        help="Semente das sequências aleatórias.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Número de processos usados pelas sequências aleatórias.")
+    args = parser.parse_args()
+
+    executar_analise_disrupcao(
+        estrategias_adaptativas=args.adaptativo,
+        num_alvos_adaptativos=args.num_alvos,
+        orcamento=args.orcamento,
+        alvos_elite=args.alvos_elite,
+        sequencias_aleatorias=args.sequencias_aleatorias,
+        seed=args.seed,
+        workers=args.workers
+    )
\ No newline at end of file
@@ -3,14 +3,163 @@ import networkx as nx
 import os
 import json 
 import community.community_louvain as community_louvain
+import argparse
+import random
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+import scipy.sparse as sp
+from CarregadorGrafo import carregar_grafo, carregar_arestas_agregadas
+from CentralidadeEsparsa import grafo_para_csr, pagerank_csr, closeness_csr
+from DeteccaoComunidades import detectar_comunidades, estatisticas_comunidades
 
-def analisar_rede_estatica():
+#Grafo compartilhado com os processos trabalhadores do cálculo paralelo de betweenness
+_grafo_worker = None
+
+def _inicializar_worker(G):
+    global _grafo_worker
+    _grafo_worker = G
+
+def _dependencias_parciais(fontes):
+    #Soma das dependências (Brandes) a partir de um subconjunto de fontes, sem normalização
+    return nx.betweenness_centrality_subset(_grafo_worker, sources=fontes, targets=list(_grafo_worker), normalized=False)
+
+def somar_dependencias(G, fontes, workers=1):
+    #Divide as fontes entre os workers e soma os vetores parciais de dependência
+    if workers <= 1:
+        return nx.betweenness_centrality_subset(G, sources=fontes, targets=list(G), normalized=False)
+
+    tamanho_lote = max(1, len(fontes) // (workers * 4))
+    lotes = [fontes[i:i + tamanho_lote] for i in range(0, len(fontes), tamanho_lote)]
+
+    total = dict.fromkeys(G, 0.0)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_inicializar_worker, initargs=(G,)) as executor:
+        for parcial in executor.map(_dependencias_parciais, lotes):
+            for no, valor in parcial.items():
+                total[no] += valor
+    return total
+
+def calcular_betweenness(G, amostras=None, workers=1, seed=42):
+    #amostras=None: Brandes exato (em paralelo se workers > 1).
+    #amostras=k: estimativa a partir de k pivôs sorteados, escalada por n/k como em nx.betweenness_centrality(k=...).
+    #Retorna (betweenness normalizada, diagnóstico da estimativa ou None no modo exato).
+    n = G.number_of_nodes()
+    if amostras is None or amostras >= n:
+        if workers <= 1:
+            return nx.betweenness_centrality(G), None
+        soma = somar_dependencias(G, list(G), workers)
+        escala = 1 / ((n - 1) * (n - 2)) if n > 2 else 1.0
+        return {no: valor * escala for no, valor in soma.items()}, None
+
+    pivos = random.Random(seed).sample(list(G), amostras)
+    metade = amostras // 2
+    soma_a = somar_dependencias(G, pivos[:metade], workers)
+    soma_b = somar_dependencias(G, pivos[metade:], workers)
+
+    escala = 1 / ((n - 1) * (n - 2)) if n > 2 else 1.0
+    betweenness = {no: (soma_a[no] + soma_b[no]) * escala * n / amostras for no in G}
+
+    #Estimativa de erro: cada metade dos pivôs gera uma estimativa independente;
+    #a diferença entre elas aproxima o erro padrão da média e a estabilidade do Top 10.
+    estimativa_a = {no: soma_a[no] * escala * n / max(metade, 1) for no in G}
+    estimativa_b = {no: soma_b[no] * escala * n / (amostras - metade) for no in G}
+
+    top10 = sorted(betweenness, key=betweenness.get, reverse=True)[:10]
+    top10_a = set(sorted(estimativa_a, key=estimativa_a.get, reverse=True)[:10])
+    top10_b = set(sorted(estimativa_b, key=estimativa_b.get, reverse=True)[:10])
+
+    erros_relativos = [
+        abs(estimativa_a[no] - estimativa_b[no]) / 2 / betweenness[no]
+        for no in top10 if betweenness[no] > 0
+    ]
+    diagnostico = {
+        'amostras': amostras,
+        'erro_relativo_medio_top10': sum(erros_relativos) / len(erros_relativos) if erros_relativos else 0.0,
+        'sobreposicao_top10_entre_metades': len(top10_a & top10_b) / 10
+    }
+    return betweenness, diagnostico
+
+#Métricas que não são atualizadas pela análise incremental e ficam marcadas como desatualizadas
+METRICAS_NAO_INCREMENTAIS = ['betweenness', 'closeness', 'comunidades']
+
+def salvar_estado_centralidade(caminho_saida_dir, num_arestas, usar_peso, desatualizadas):
+    #num_arestas: quantas arestas agregadas (na ordem do armazenamento) os valores salvos já consideram
+    with open(os.path.join(caminho_saida_dir, 'centralidade_estatica_estado.json'), 'w') as f:
+        json.dump({'num_arestas': num_arestas, 'usar_peso': usar_peso, 'desatualizadas': desatualizadas}, f, indent=4)
+
+def atualizar_rede_estatica(tol=1.0e-6):
+    #Atualiza centralidade_estatica.csv após uma ingestão incremental (PreProcessamento.py --anexar):
+    #o grau soma apenas as arestas novas e o PageRank parte do vetor salvo, convergindo em poucas iterações.
+    #Betweenness, Closeness e comunidades mantêm os valores anteriores e são marcadas como desatualizadas.
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    root_dir = os.path.abspath(os.path.join(script_dir, '..', '..'))
+    caminho_saida_dir = os.path.join(root_dir, 'dataSets', 'Outputs')
+    caminho_saida_centralidade = os.path.join(caminho_saida_dir, 'centralidade_estatica.csv')
+    caminho_saida_top10_pagerank_csv = os.path.join(caminho_saida_dir, 'top10_pagerank.csv')
+
+    try:
+        with open(os.path.join(caminho_saida_dir, 'centralidade_estatica_estado.json'), 'r') as f:
+            estado = json.load(f)
+        #keep_default_na=False: endereços como 'null' ou 'na' não viram NaN no índice
+        df_anterior = pd.read_csv(caminho_saida_centralidade, index_col=0, keep_default_na=False)
+        enderecos, origem, destino, contagem = carregar_arestas_agregadas(caminho_saida_dir)
+    except FileNotFoundError as e:
+        print(f"ERRO: '{e.filename}' não encontrado. Execute a análise estática completa antes da incremental.")
+        return
+
+    num_anteriores = estado['num_arestas']
+    num_novas = len(origem) - num_anteriores
+    if num_novas <= 0:
+        print("Nenhuma aresta nova desde a última análise.")
+        return df_anterior
+
+    n = len(enderecos)
+    print(f"Atualizando centralidades com {num_novas} arestas novas ({num_novas / len(origem):.2%} do total, {n - len(df_anterior)} nós novos)...")
+
+    #Grau: apenas as arestas novas (pares remetente -> destinatário inéditos) alteram o número de vizinhos
+    df_centralidade = df_anterior.reindex(enderecos)
+    origem_nova = np.asarray(origem[num_anteriores:])
+    destino_nova = np.asarray(destino[num_anteriores:])
+    df_centralidade['in_degree'] = df_centralidade['in_degree'].fillna(0).astype(np.int64) + np.bincount(destino_nova, minlength=n)
+    df_centralidade['out_degree'] = df_centralidade['out_degree'].fillna(0).astype(np.int64) + np.bincount(origem_nova, minlength=n)
+
+    #PageRank reiniciado a partir do vetor salvo; nós novos começam com 1/n
+    pesos = np.asarray(contagem, dtype=np.float64) if estado['usar_peso'] else np.ones(len(origem))
+    A = sp.csr_array((pesos, (np.asarray(origem), np.asarray(destino))), shape=(n, n))
+    nstart = df_centralidade['pagerank'].fillna(1.0 / n).to_numpy()
+    df_centralidade['pagerank'] = pagerank_csr(A, alpha=0.85, tol=tol, nstart=nstart)
+
+    #Nós novos ficam com Betweenness e Closeness 0, como na análise completa (fillna(0))
+    df_centralidade = df_centralidade.fillna(0)
+
+    desatualizadas = sorted(set(estado['desatualizadas']) | set(METRICAS_NAO_INCREMENTAIS))
+    print(f"Métricas mantidas com os valores anteriores (desatualizadas): {', '.join(desatualizadas)}")
+
+    #Mesma ordem de linhas do arquivo anterior, com os nós novos no fim
+    novos = [endereco for endereco in enderecos if endereco not in df_anterior.index]
+    df_centralidade = df_centralidade.reindex(list(df_anterior.index) + novos)
+    df_centralidade.to_csv(caminho_saida_centralidade)
+    salvar_estado_centralidade(caminho_saida_dir, len(origem), estado['usar_peso'], desatualizadas)
+    print(f"Resultados de centralidade salvos em: {caminho_saida_centralidade}")
+
+    df_top10_pagerank = df_centralidade.sort_values(by='pagerank', ascending=False).head(10)
+    df_top10_pagerank[['in_degree', 'out_degree', 'pagerank']].to_csv(caminho_saida_top10_pagerank_csv)
+    print(f"Top 10 PageRank salvo em: {caminho_saida_top10_pagerank_csv}")
+    print(df_top10_pagerank[['in_degree', 'out_degree', 'pagerank']])
+
+    return df_centralidade
+
+def analisar_rede_estatica(G=None, amostras_betweenness=None, workers=1, backend='networkx', usar_peso=False,
+                           resolucoes=(1.0,), seeds=(42,)):
+    #G: grafo já construído (opcional); se omitido, é obtido via CarregadorGrafo.
+    #amostras_betweenness/workers: ver calcular_betweenness.
+    #backend: 'networkx' ou 'esparso' (PageRank e Closeness sobre matriz CSR, ver CentralidadeEsparsa).
+    #usar_peso: PageRank e Louvain ponderados pelo volume de e-mails de cada par (atributo 'contagem').
+    #resolucoes/seeds: varredura do Louvain; a primeira combinação gera os arquivos de comunidades.
+    peso = 'contagem' if usar_peso else None
     #Definição dos Caminhos
     script_dir = os.path.dirname(os.path.abspath(__file__))
     root_dir = os.path.abspath(os.path.join(script_dir, '..', '..')) 
 
-    caminho_entrada = os.path.join(root_dir, 'dataSets', 'Outputs', 'EnronEmailsTratados.csv')
-
     caminho_saida_dir = os.path.join(root_dir, 'dataSets', 'Outputs')
     caminho_saida_centralidade = os.path.join(caminho_saida_dir, 'centralidade_estatica.csv')
     caminho_saida_comunidades = os.path.join(caminho_saida_dir, 'comunidades_estaticas.json')
@@ -18,28 +167,21 @@ def analisar_rede_estatica():
     caminho_saida_top10_csv = os.path.join(caminho_saida_dir, 'top10_intermediarios.csv')
     caminho_saida_analise_comunidades_csv = os.path.join(caminho_saida_dir, 'analise_comunidades.csv')
     caminho_saida_top5_comunidades_csv = os.path.join(caminho_saida_dir, 'top5_maiores_comunidades.csv')
+    caminho_saida_varredura_csv = os.path.join(caminho_saida_dir, 'varredura_comunidades.csv')
+    caminho_cache_dir = os.path.join(caminho_saida_dir, 'cache')
 
     caminho_saida_top10_pagerank_csv = os.path.join(caminho_saida_dir, 'top10_pagerank.csv')
     caminho_saida_top10_closeness_csv = os.path.join(caminho_saida_dir, 'top10_closeness.csv')
 
-    #Carregamento dos Dados
-    print(f"Carregando dados tratados de: {caminho_entrada}")
-    try:
-        df = pd.read_csv(caminho_entrada, parse_dates=['data'])
-    except FileNotFoundError:
-        print(f"ERRO: Arquivo tratado não encontrado em '{caminho_entrada}'.")
-        print("Certifique-se de que o script 'PreProcessamento.py' foi executado com sucesso.")
-        return
+    #Carregamento dos Dados e Construção do Grafo
+    if G is None:
+        try:
+            G = carregar_grafo(caminho_saida_dir)
+        except FileNotFoundError:
+            print(f"ERRO: Dados tratados não encontrados em '{caminho_saida_dir}'.")
+            print("Certifique-se de que o script 'PreProcessamento.py' foi executado com sucesso.")
+            return
 
-    #Construção do Grafo 
-    print("Construindo o grafo")
-    
-    G = nx.from_pandas_edgelist(
-        df,
-        'remetente',
-        'destinatario',
-        create_using=nx.DiGraph()
-    )
     print(f"Grafo construído com {G.number_of_nodes()} nós (pessoas) e {G.number_of_edges()} arestas (e-mails).")
 
     #Cálculo das Métricas de Centralidade
@@ -48,15 +190,32 @@ def analisar_rede_estatica():
     in_degree_centrality = {node: val for node, val in G.in_degree()}
     out_degree_centrality = {node: val for node, val in G.out_degree()}
 
-    print("Calculando centralidade de intermediação")
-    betweenness_centrality = nx.betweenness_centrality(G)
+    if amostras_betweenness is None:
+        print(f"Calculando centralidade de intermediação (exata, {workers} worker(s))")
+    else:
+        print(f"Calculando centralidade de intermediação (aproximada com {amostras_betweenness} pivôs, {workers} worker(s))")
+    betweenness_centrality, diagnostico_betweenness = calcular_betweenness(G, amostras_betweenness, workers)
+    if diagnostico_betweenness:
+        print(f"  Erro relativo médio estimado no Top 10: {diagnostico_betweenness['erro_relativo_medio_top10']:.2%}")
+        print(f"  Sobreposição do Top 10 entre metades independentes da amostra: {diagnostico_betweenness['sobreposicao_top10_entre_metades']:.0%}")
+
+    if backend == 'esparso':
+        print("Convertendo o grafo para matriz de adjacência esparsa (CSR)")
+        nos_csr, A = grafo_para_csr(G)
+        A_pagerank = grafo_para_csr(G, peso)[1] if usar_peso else A
 
     print("Calculando PageRank (para grau de autoridade)")
-    pagerank = nx.pagerank(G, alpha=0.85)
+    if backend == 'esparso':
+        pagerank = dict(zip(nos_csr, pagerank_csr(A_pagerank, alpha=0.85).tolist()))
+    else:
+        pagerank = nx.pagerank(G, alpha=0.85, weight=peso)
 
     print("Calculando centralidade de proximidade")
     try:
-        closeness_centrality = nx.closeness_centrality(G)
+        if backend == 'esparso':
+            closeness_centrality = dict(zip(nos_csr, closeness_csr(A).tolist()))
+        else:
+            closeness_centrality = nx.closeness_centrality(G)
     except Exception as e:
         print(f"ERRO ao calcular Closeness Centrality: {e}. Pulando esta métrica.")
         closeness_centrality = {}
@@ -77,6 +236,7 @@ def analisar_rede_estatica():
     df_centralidade = df_centralidade.fillna(0)
     
     df_centralidade.to_csv(caminho_saida_centralidade)
+    salvar_estado_centralidade(caminho_saida_dir, G.number_of_edges(), usar_peso, [] if closeness_centrality else ['closeness'])
     print(f"Resultados de centralidade salvos em: {caminho_saida_centralidade}")
 
     print("Salvando o Top 10 de intermediários em um arquivo CSV...")
@@ -110,9 +270,22 @@ def analisar_rede_estatica():
     #Detecção de Comunidades
     if community_louvain:
         print("\nDetectando comunidades (subgrupos)...")
-        G_nao_direcionado = G.to_undirected()
-        
-        particao = community_louvain.best_partition(G_nao_direcionado, random_state=42)
+        nos_comunidades, resultados_louvain = detectar_comunidades(
+            G, resolucoes, seeds, peso=peso, workers=workers, caminho_cache_dir=caminho_cache_dir
+        )
+
+        if len(resultados_louvain) > 1:
+            df_varredura = pd.DataFrame([
+                {'resolucao': resolucao, 'seed': seed, 'num_comunidades': len(np.unique(part)), 'modularidade': modularidade}
+                for (resolucao, seed), (part, modularidade) in resultados_louvain.items()
+            ])
+            df_varredura.to_csv(caminho_saida_varredura_csv, index=False)
+            print("\n--- Varredura de Resoluções/Sementes do Louvain ---")
+            print(df_varredura)
+            print(f"Varredura salva em: {caminho_saida_varredura_csv}")
+
+        particao_ids, _ = resultados_louvain[(float(resolucoes[0]), int(seeds[0]))]
+        particao = dict(zip(nos_comunidades, particao_ids.tolist()))
         
         print(f"Foram detectadas {len(set(particao.values()))} comunidades.")
         
@@ -123,23 +296,9 @@ def analisar_rede_estatica():
         #Análise das Comunidades
         print("Realizando análise das comunidades...")
         
-        df_centralidade['comunidade_id'] = df_centralidade.index.map(particao)
-        
-        analise_comunidades_lista = []
-        for comm_id, grupo in df_centralidade.groupby('comunidade_id'):
-            if grupo.empty:
-                continue
-            lider_comm = grupo['betweenness'].idxmax()
-            num_membros = len(grupo)
-            
-            analise_comunidades_lista.append({
-                'id_comunidade': comm_id,
-                'num_membros': num_membros,
-                'lider_intermediario_interno': lider_comm
-            })
-            
-        df_analise_comunidades = pd.DataFrame(analise_comunidades_lista)
-        df_analise_comunidades = df_analise_comunidades.sort_values(by='num_membros', ascending=False)
+        df_analise_comunidades = estatisticas_comunidades(
+            nos_comunidades, particao_ids, df_centralidade['betweenness'].reindex(nos_comunidades).to_numpy()
+        )
         
         df_analise_comunidades.to_csv(caminho_saida_analise_comunidades_csv, index=False)
         print(f"Análise de comunidades salva em: {caminho_saida_analise_comunidades_csv}")
@@ -153,4 +312,31 @@ def analisar_rede_estatica():
         print(df_top5_comunidades)
 
 if __name__ == "__main__":
-    analisar_rede_estatica()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Análise estática da rede de e-mails.")
+    parser.add_argument('--amostras-betweenness', type=int, default=None,
+                        help="Número de pivôs para a betweenness aproximada (padrão: exata).")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processos usados no cálculo da betweenness e na varredura do Louvain.")
+    parser.add_argument('--backend', default='networkx', choices=['networkx', 'esparso'],
+                        help="Implementação de PageRank e Closeness ('esparso' usa matrizes CSR do SciPy).")
+    parser.add_argument('--usar-peso', action='store_true',
+                        help="Pondera PageRank e Louvain pelo número de e-mails de cada par remetente -> destinatário.")
+    parser.add_argument('--resolucoes', type=float, nargs='+', default=[1.0],
+                        help="Resoluções do Louvain (a primeira gera os arquivos de comunidades).")
+    parser.add_argument('--seeds', type=int, nargs='+', default=[42],
+                        help="Sementes do Louvain para cada resolução.")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Após 'PreProcessamento.py --anexar', atualiza apenas grau e PageRank.")
+    args = parser.parse_args()
+
+    if args.incremental:
+        atualizar_rede_estatica()
+    else:
+        analisar_rede_estatica(
+            amostras_betweenness=args.amostras_betweenness,
+            workers=args.workers,
+            backend=args.backend,
+            usar_peso=args.usar_peso,
+            resolucoes=args.resolucoes,
+            seeds=args.seeds
+        )
\ No newline at end of file
@@ -0,0 +1,164 @@
+import pandas as pd
+import networkx as nx
+import numpy as np
+import os
+import argparse
+import community.community_louvain as community_louvain
+from CarregadorGrafo import carregar_arestas
+
+def gerar_janelas(inicio, fim, meses_janela, meses_passo):
+    #Janelas [início, fim) mensais: com meses_passo == meses_janela são disjuntas (tumbling),
+    #com meses_passo < meses_janela se sobrepõem (sliding).
+    inicios = pd.date_range(inicio, fim, freq=pd.DateOffset(months=meses_passo), tz='UTC')
+    return [(ini, ini + pd.DateOffset(months=meses_janela)) for ini in inicios if ini < pd.Timestamp(fim, tz='UTC')]
+
+class GrafoJanela:
+    #DiGraph da janela atual mantido incrementalmente: cada par remetente -> destinatário guarda
+    #quantas interações da janela o sustentam, e a aresta só sai do grafo quando a contagem zera.
+    def __init__(self, enderecos):
+        self.enderecos = enderecos
+        self.contagens = {}
+        self.G = nx.DiGraph()
+
+    def adicionar(self, origem, destino):
+        for u, v in zip(origem.tolist(), destino.tolist()):
+            chave = (u, v)
+            contagem = self.contagens.get(chave, 0)
+            if contagem == 0:
+                self.G.add_edge(self.enderecos[u], self.enderecos[v])
+            self.contagens[chave] = contagem + 1
+
+    def expirar(self, origem, destino):
+        for u, v in zip(origem.tolist(), destino.tolist()):
+            chave = (u, v)
+            contagem = self.contagens[chave] - 1
+            if contagem == 0:
+                del self.contagens[chave]
+                no_u, no_v = self.enderecos[u], self.enderecos[v]
+                self.G.remove_edge(no_u, no_v)
+                for no in (no_u, no_v):
+                    if no in self.G and self.G.degree(no) == 0:
+                        self.G.remove_node(no)
+            else:
+                self.contagens[chave] = contagem
+
+def pagerank_reaproveitado(G, pagerank_anterior):
+    #Usa o vetor da janela anterior como ponto de partida; nós novos começam com 1/n (n = nós da janela atual).
+    if not pagerank_anterior:
+        return nx.pagerank(G, alpha=0.85)
+    valor_inicial = 1.0 / G.number_of_nodes()
+    nstart = {no: pagerank_anterior.get(no, valor_inicial) for no in G}
+    return nx.pagerank(G, alpha=0.85, nstart=nstart)
+
+def particao_reaproveitada(G_und, particao_anterior):
+    #Louvain partindo das comunidades da janela anterior; nós novos começam isolados.
+    if not particao_anterior:
+        return community_louvain.best_partition(G_und, random_state=42)
+    proximo_id = max(particao_anterior.values()) + 1
+    inicial = {}
+    for no in G_und:
+        if no in particao_anterior:
+            inicial[no] = particao_anterior[no]
+        else:
+            inicial[no] = proximo_id
+            proximo_id += 1
+    return community_louvain.best_partition(G_und, partition=inicial, random_state=42)
+
+def analisar_rede_temporal(inicio='1999-01-01', fim='2003-01-01', meses_janela=1, meses_passo=1, top_n=5):
+    #Definição dos Caminhos
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    root_dir = os.path.abspath(os.path.join(script_dir, '..', '..'))
+    caminho_saida_dir = os.path.join(root_dir, 'dataSets', 'Outputs')
+    caminho_saida_metricas = os.path.join(caminho_saida_dir, 'metricas_temporais.csv')
+
+    try:
+        enderecos, origem, destino, timestamp = carregar_arestas(caminho_saida_dir)
+    except FileNotFoundError:
+        print(f"ERRO: Dados tratados não encontrados em '{caminho_saida_dir}'.")
+        print("Certifique-se de que o script 'PreProcessamento.py' foi executado com sucesso.")
+        return
+
+    #Ordenação das interações por data: cada janela passa a ser um intervalo contíguo de índices
+    ordem = np.argsort(timestamp, kind='stable')
+    origem = np.asarray(origem)[ordem]
+    destino = np.asarray(destino)[ordem]
+    timestamp = np.asarray(timestamp)[ordem]
+
+    janelas = gerar_janelas(inicio, fim, meses_janela, meses_passo)
+    print(f"Analisando {len(janelas)} janelas de {meses_janela} mês(es), com passo de {meses_passo} mês(es), entre {inicio} e {fim}")
+
+    grafo_janela = GrafoJanela(enderecos)
+    indice_inicio, indice_fim = 0, 0
+    pagerank_anterior = None
+    particao_anterior = None
+    linhas = []
+
+    for ini_janela, fim_janela in janelas:
+        novo_inicio = int(np.searchsorted(timestamp, ini_janela.timestamp(), side='left'))
+        novo_fim = int(np.searchsorted(timestamp, fim_janela.timestamp(), side='left'))
+
+        #Atualização incremental: entram as interações novas, saem as que ficaram antes da janela
+        if novo_fim > indice_fim:
+            inicio_entrada = max(indice_fim, novo_inicio)
+            grafo_janela.adicionar(origem[inicio_entrada:novo_fim], destino[inicio_entrada:novo_fim])
+        if novo_inicio > indice_inicio:
+            fim_saida = min(novo_inicio, indice_fim)
+            grafo_janela.expirar(origem[indice_inicio:fim_saida], destino[indice_inicio:fim_saida])
+        indice_inicio, indice_fim = novo_inicio, max(novo_fim, indice_fim)
+
+        G = grafo_janela.G
+        linha = {
+            'inicio_janela': ini_janela.date().isoformat(),
+            'fim_janela': fim_janela.date().isoformat(),
+            'num_interacoes': novo_fim - novo_inicio,
+            'num_nos': G.number_of_nodes(),
+            'num_arestas': G.number_of_edges()
+        }
+
+        if G.number_of_edges() > 0:
+            graus = dict(G.degree())
+            top_grau = sorted(graus, key=graus.get, reverse=True)[:top_n]
+
+            pagerank_anterior = pagerank_reaproveitado(G, pagerank_anterior)
+            top_pagerank = sorted(pagerank_anterior, key=pagerank_anterior.get, reverse=True)[:top_n]
+
+            particao_anterior = particao_reaproveitada(G.to_undirected(), particao_anterior)
+
+            linha.update({
+                'maior_grau': top_grau[0],
+                'valor_maior_grau': graus[top_grau[0]],
+                'maior_pagerank': top_pagerank[0],
+                'valor_maior_pagerank': pagerank_anterior[top_pagerank[0]],
+                'num_comunidades': len(set(particao_anterior.values())),
+                f'top{top_n}_grau': ';'.join(top_grau),
+                f'top{top_n}_pagerank': ';'.join(top_pagerank)
+            })
+        else:
+            pagerank_anterior = None
+            particao_anterior = None
+            linha['num_comunidades'] = 0
+
+        linhas.append(linha)
+        print(f"  {linha['inicio_janela']} a {linha['fim_janela']}: {linha['num_nos']} nós, {linha['num_arestas']} arestas, "
+              f"{linha['num_comunidades']} comunidades")
+
+    colunas = ['inicio_janela', 'fim_janela', 'num_interacoes', 'num_nos', 'num_arestas', 'num_comunidades',
+               'maior_grau', 'valor_maior_grau', 'maior_pagerank', 'valor_maior_pagerank',
+               f'top{top_n}_grau', f'top{top_n}_pagerank']
+    df_metricas = pd.DataFrame(linhas, columns=colunas)
+    os.makedirs(caminho_saida_dir, exist_ok=True)
+    df_metricas.to_csv(caminho_saida_metricas, index=False)
+    print(f"\nMétricas por janela salvas em: {caminho_saida_metricas}")
+
+    return df_metricas
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Análise temporal da rede de e-mails em janelas de tempo.")
+    parser.add_argument('--inicio', default='1999-01-01', help="Início da primeira janela (AAAA-MM-DD).")
+    parser.add_argument('--fim', default='2003-01-01', help="Data limite das janelas (AAAA-MM-DD, exclusiva).")
+    parser.add_argument('--meses-janela', type=int, default=1, help="Duração de cada janela em meses.")
+    parser.add_argument('--meses-passo', type=int, default=1,
+                        help="Deslocamento entre janelas em meses (menor que a duração = janelas deslizantes).")
+    args = parser.parse_args()
+
+    analisar_rede_temporal(args.inicio, args.fim, args.meses_janela, args.meses_passo)
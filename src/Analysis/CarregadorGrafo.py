@@ -0,0 +1,190 @@
+import pandas as pd
+import networkx as nx
+import numpy as np
+import os
+import json
+import glob
+import pickle
+import hashlib
+import tempfile
+
+#Formato gravado por DataTreatment/ArmazenamentoArestas.py
+NOME_DIRETORIO_ARMAZENAMENTO = 'ArestasBinarias'
+NOME_ARQUIVO_TRATADO = 'EnronEmailsTratados.csv'
+NOME_DIRETORIO_CACHE = 'cache'
+
+#Entra na chave do snapshot: incrementar quando construir_grafo passar a gerar um grafo diferente
+#(atributos, pesos, tipo do grafo), para que snapshots antigos não sejam reaproveitados
+VERSAO_FORMATO_SNAPSHOT = 1
+
+#Grafos já construídos neste processo, indexados pela chave do snapshot.
+#Os grafos retornados são compartilhados: quem precisar alterá-los deve trabalhar sobre uma cópia.
+_grafos_em_memoria = {}
+
+def armazenamento_disponivel(caminho_saida_dir):
+    #O armazenamento binário só é usado se existir e não for mais antigo que o CSV tratado.
+    diretorio = os.path.join(caminho_saida_dir, NOME_DIRETORIO_ARMAZENAMENTO)
+    caminho_origem = os.path.join(diretorio, 'origem.npy')
+    caminho_csv = os.path.join(caminho_saida_dir, NOME_ARQUIVO_TRATADO)
+
+    if not os.path.exists(caminho_origem):
+        return False
+    if os.path.exists(caminho_csv) and os.path.getmtime(caminho_csv) > os.path.getmtime(caminho_origem):
+        return False
+    return True
+
+def carregar_armazenamento_arestas(caminho_saida_dir):
+    #Retorna os endereços e os arrays de arestas mapeados em memória (sem custo de parsing).
+    diretorio = os.path.join(caminho_saida_dir, NOME_DIRETORIO_ARMAZENAMENTO)
+
+    with open(os.path.join(diretorio, 'enderecos.json'), 'r', encoding='utf-8') as f:
+        enderecos = np.array(json.load(f), dtype=object)
+
+    origem = np.load(os.path.join(diretorio, 'origem.npy'), mmap_mode='r')
+    destino = np.load(os.path.join(diretorio, 'destino.npy'), mmap_mode='r')
+    timestamp = np.load(os.path.join(diretorio, 'timestamp.npy'), mmap_mode='r')
+
+    return enderecos, origem, destino, timestamp
+
+def contar_pares(origem, destino):
+    #Agrupa as interações repetidas de cada par, mantendo a ordem de primeira aparição dos pares
+    df = pd.DataFrame({'origem': origem, 'destino': destino})
+    df_agregado = df.groupby(['origem', 'destino'], sort=False).size().reset_index(name='contagem')
+    return df_agregado['origem'].to_numpy(), df_agregado['destino'].to_numpy(), df_agregado['contagem'].to_numpy()
+
+def carregar_arestas_agregadas(caminho_saida_dir):
+    #Retorna (endereços, origem, destino, contagem) com um registro por par remetente -> destinatário.
+    diretorio = os.path.join(caminho_saida_dir, NOME_DIRETORIO_ARMAZENAMENTO)
+    caminho_agregado = os.path.join(diretorio, 'agregado_origem.npy')
+
+    if armazenamento_disponivel(caminho_saida_dir) and os.path.exists(caminho_agregado):
+        with open(os.path.join(diretorio, 'enderecos.json'), 'r', encoding='utf-8') as f:
+            enderecos = np.array(json.load(f), dtype=object)
+        origem = np.load(caminho_agregado, mmap_mode='r')
+        destino = np.load(os.path.join(diretorio, 'agregado_destino.npy'), mmap_mode='r')
+        contagem = np.load(os.path.join(diretorio, 'agregado_contagem.npy'), mmap_mode='r')
+        return enderecos, origem, destino, contagem
+
+    if armazenamento_disponivel(caminho_saida_dir):
+        enderecos, origem, destino, _ = carregar_armazenamento_arestas(caminho_saida_dir)
+    else:
+        #Sem o armazenamento, lê do CSV tratado apenas as colunas dos pares (as datas não são necessárias)
+        caminho_csv = os.path.join(caminho_saida_dir, NOME_ARQUIVO_TRATADO)
+        print(f"Carregando dados tratados de: {caminho_csv}")
+        enderecos, origem, destino = codificar_pares(pd.read_csv(caminho_csv, usecols=['remetente', 'destinatario']))
+    return (enderecos,) + contar_pares(origem, destino)
+
+def codificar_pares(df):
+    #Converte as colunas remetente/destinatario do CSV tratado em (endereços, origem, destino)
+    n = len(df)
+    codigos, enderecos = pd.factorize(np.concatenate([df['remetente'].to_numpy(), df['destinatario'].to_numpy()]))
+    return np.asarray(enderecos, dtype=object), codigos[:n].astype(np.int32), codigos[n:].astype(np.int32)
+
+def carregar_arestas(caminho_saida_dir):
+    #Mesmo retorno de carregar_armazenamento_arestas (endereços, origem, destino, timestamp em segundos),
+    #recorrendo ao CSV tratado quando o armazenamento binário não está disponível.
+    if armazenamento_disponivel(caminho_saida_dir):
+        return carregar_armazenamento_arestas(caminho_saida_dir)
+
+    caminho_csv = os.path.join(caminho_saida_dir, NOME_ARQUIVO_TRATADO)
+    print(f"Carregando dados tratados de: {caminho_csv}")
+    df = pd.read_csv(caminho_csv, usecols=['remetente', 'destinatario', 'data'])
+
+    enderecos, origem, destino = codificar_pares(df)
+    timestamp = pd.to_datetime(df['data'], utc=True).dt.as_unit('s').astype('int64').to_numpy()
+
+    return enderecos, origem, destino, timestamp
+
+def arquivos_de_entrada(caminho_saida_dir):
+    if armazenamento_disponivel(caminho_saida_dir):
+        diretorio = os.path.join(caminho_saida_dir, NOME_DIRETORIO_ARMAZENAMENTO)
+        nomes = ['enderecos.json', 'origem.npy', 'destino.npy', 'agregado_contagem.npy']
+        return [os.path.join(diretorio, nome) for nome in nomes if os.path.exists(os.path.join(diretorio, nome))]
+    return [os.path.join(caminho_saida_dir, NOME_ARQUIVO_TRATADO)]
+
+def calcular_chave_entrada(caminhos):
+    #Chave do snapshot: versão do formato, conteúdo (hash) e data de modificação de cada arquivo de entrada.
+    h = hashlib.sha256()
+    h.update(f'formato={VERSAO_FORMATO_SNAPSHOT}'.encode('utf-8'))
+    for caminho in caminhos:
+        h.update(os.path.basename(caminho).encode('utf-8'))
+        h.update(str(os.stat(caminho).st_mtime_ns).encode('utf-8'))
+        with open(caminho, 'rb') as f:
+            for bloco in iter(lambda: f.read(1 << 20), b''):
+                h.update(bloco)
+    return h.hexdigest()[:16]
+
+def construir_grafo(caminho_saida_dir):
+    #Constrói o DiGraph remetente -> destinatário a partir das arestas agregadas: cada aresta guarda
+    #no atributo 'contagem' o número de e-mails do par (usado como peso quando solicitado).
+    if armazenamento_disponivel(caminho_saida_dir):
+        print(f"Carregando arestas do armazenamento binário em: {os.path.join(caminho_saida_dir, NOME_DIRETORIO_ARMAZENAMENTO)}")
+
+    enderecos, origem, destino, contagem = carregar_arestas_agregadas(caminho_saida_dir)
+
+    G = nx.DiGraph()
+    G.add_weighted_edges_from(
+        zip(enderecos[origem], enderecos[destino], np.asarray(contagem).tolist()),
+        weight='contagem'
+    )
+    return G
+
+def salvar_snapshot(caminho_cache_dir, caminho_snapshot, G):
+    #Grava em um arquivo temporário do mesmo diretório e o move para o lugar com os.replace (atômico):
+    #processos executados em paralelo nunca leem um snapshot pela metade.
+    os.makedirs(caminho_cache_dir, exist_ok=True)
+    descritor, caminho_temp = tempfile.mkstemp(dir=caminho_cache_dir, prefix='grafo_', suffix='.tmp')
+    try:
+        with os.fdopen(descritor, 'wb') as f:
+            pickle.dump(G, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(caminho_temp, caminho_snapshot)
+    except BaseException:
+        try:
+            os.remove(caminho_temp)
+        except FileNotFoundError:
+            pass
+        raise
+
+    #Remove apenas os snapshots de outras chaves; outro processo pode já tê-los removido
+    for snapshot_antigo in glob.glob(os.path.join(caminho_cache_dir, 'grafo_*.pickle')):
+        if snapshot_antigo != caminho_snapshot:
+            try:
+                os.remove(snapshot_antigo)
+            except FileNotFoundError:
+                pass
+
+def carregar_snapshot(caminho_snapshot):
+    #Retorna None se o snapshot não existir ou não puder ser lido (nesse caso o grafo é reconstruído)
+    try:
+        with open(caminho_snapshot, 'rb') as f:
+            G = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except (EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError, OSError) as e:
+        print(f"Snapshot inválido em '{caminho_snapshot}' ({e}); reconstruindo o grafo.")
+        return None
+    print(f"Snapshot do grafo carregado de: {caminho_snapshot}")
+    return G
+
+def carregar_grafo(caminho_saida_dir, usar_cache=True):
+    #Retorna o grafo completo construindo-o no máximo uma vez: primeiro procura na memória
+    #do processo, depois no snapshot em disco (dataSets/Outputs/cache/grafo_<chave>.pickle).
+    #Lança FileNotFoundError se nem o armazenamento binário nem o CSV tratado existirem.
+    if not usar_cache:
+        return construir_grafo(caminho_saida_dir)
+
+    chave = calcular_chave_entrada(arquivos_de_entrada(caminho_saida_dir))
+    if chave in _grafos_em_memoria:
+        return _grafos_em_memoria[chave]
+
+    caminho_cache_dir = os.path.join(caminho_saida_dir, NOME_DIRETORIO_CACHE)
+    caminho_snapshot = os.path.join(caminho_cache_dir, f'grafo_{chave}.pickle')
+
+    G = carregar_snapshot(caminho_snapshot)
+    if G is None:
+        G = construir_grafo(caminho_saida_dir)
+        salvar_snapshot(caminho_cache_dir, caminho_snapshot, G)
+        print(f"Snapshot do grafo salvo em: {caminho_snapshot}")
+
+    _grafos_em_memoria[chave] = G
+    return G
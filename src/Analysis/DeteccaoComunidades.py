@@ -0,0 +1,118 @@
+import pandas as pd
+import networkx as nx
+import numpy as np
+import os
+import glob
+import hashlib
+import community.community_louvain as community_louvain
+from concurrent.futures import ProcessPoolExecutor
+
+#Detecção de comunidades (Louvain, python-louvain) com varredura de resoluções/sementes em
+#paralelo e cache de cada partição em disco.
+
+#Grafo não direcionado compartilhado com os processos trabalhadores
+_grafo_worker = None
+
+def grafo_nao_direcionado(G, peso=None):
+    #Sem peso, equivale a G.to_undirected() sem copiar os atributos: cada par conectado vira uma aresta.
+    #Com peso, os volumes u -> v e v -> u são somados no atributo 'weight' (laços mantêm o peso original).
+    G_nao_direcionado = nx.Graph()
+    G_nao_direcionado.add_nodes_from(G)
+    if peso is None:
+        G_nao_direcionado.add_edges_from(G.edges())
+        return G_nao_direcionado
+
+    for u, v, valor in G.edges(data=peso, default=1):
+        if G_nao_direcionado.has_edge(u, v):
+            G_nao_direcionado[u][v]['weight'] += valor
+        else:
+            G_nao_direcionado.add_edge(u, v, weight=valor)
+    return G_nao_direcionado
+
+def chave_grafo(G_nao_direcionado):
+    #Identifica o grafo pelo conteúdo: nós e arestas (com peso), na ordem de iteração do grafo
+    h = hashlib.sha256()
+    h.update('\n'.join(map(str, G_nao_direcionado)).encode('utf-8'))
+    for u, v, valor in G_nao_direcionado.edges(data='weight', default=1):
+        h.update(f'{u}\t{v}\t{valor}\n'.encode('utf-8'))
+    return h.hexdigest()[:16]
+
+def _inicializar_worker(G_nao_direcionado):
+    global _grafo_worker
+    _grafo_worker = G_nao_direcionado
+
+def _executar_louvain(parametros):
+    resolucao, seed = parametros
+    particao = community_louvain.best_partition(_grafo_worker, resolution=resolucao, random_state=seed)
+    modularidade = community_louvain.modularity(particao, _grafo_worker)
+    return np.fromiter((particao[no] for no in _grafo_worker), dtype=np.int64, count=len(particao)), modularidade
+
+def caminho_particao(caminho_cache_dir, chave, resolucao, seed):
+    return os.path.join(caminho_cache_dir, f'comunidades_{chave}_r{resolucao:g}_s{seed}.npz')
+
+def remover_particoes_antigas(caminho_cache_dir, chave):
+    #Partições de outros grafos não serão mais lidas; outro processo pode já tê-las removido
+    for caminho_antigo in glob.glob(os.path.join(caminho_cache_dir, 'comunidades_*.npz')):
+        if not os.path.basename(caminho_antigo).startswith(f'comunidades_{chave}_'):
+            try:
+                os.remove(caminho_antigo)
+            except FileNotFoundError:
+                pass
+
+def detectar_comunidades(G, resolucoes=(1.0,), seeds=(42,), peso=None, workers=1, caminho_cache_dir=None):
+    #Retorna (nós, {(resolução, semente): (array com a comunidade de cada nó, modularidade)}),
+    #com os arrays na ordem da lista de nós. Partições já calculadas para o mesmo grafo e
+    #parâmetros são lidas do cache.
+    G_nao_direcionado = grafo_nao_direcionado(G, peso)
+    nos = list(G_nao_direcionado)
+    chave = chave_grafo(G_nao_direcionado)
+    combinacoes = [(float(r), int(s)) for r in resolucoes for s in seeds]
+
+    resultados = {}
+    pendentes = []
+    for resolucao, seed in combinacoes:
+        caminho = caminho_particao(caminho_cache_dir, chave, resolucao, seed) if caminho_cache_dir else None
+        if caminho and os.path.exists(caminho):
+            dados = np.load(caminho)
+            resultados[(resolucao, seed)] = (dados['particao'], float(dados['modularidade']))
+            print(f"  Partição (resolução {resolucao:g}, semente {seed}) carregada do cache.")
+        else:
+            pendentes.append((resolucao, seed))
+
+    if pendentes:
+        print(f"  Executando Louvain para {len(pendentes)} combinação(ões) de resolução/semente com {workers} worker(s)...")
+        if workers > 1 and len(pendentes) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(pendentes)), initializer=_inicializar_worker,
+                                     initargs=(G_nao_direcionado,)) as executor:
+                calculados = list(executor.map(_executar_louvain, pendentes))
+        else:
+            _inicializar_worker(G_nao_direcionado)
+            calculados = [_executar_louvain(parametros) for parametros in pendentes]
+
+        for (resolucao, seed), (particao, modularidade) in zip(pendentes, calculados):
+            resultados[(resolucao, seed)] = (particao, modularidade)
+            if caminho_cache_dir:
+                os.makedirs(caminho_cache_dir, exist_ok=True)
+                np.savez(caminho_particao(caminho_cache_dir, chave, resolucao, seed), particao=particao, modularidade=modularidade)
+
+    if caminho_cache_dir and os.path.isdir(caminho_cache_dir):
+        remover_particoes_antigas(caminho_cache_dir, chave)
+
+    return nos, resultados
+
+def estatisticas_comunidades(nos, particao, betweenness):
+    #Tamanho e líder (maior betweenness, primeiro nó em caso de empate) de cada comunidade,
+    #calculados em uma única passada vetorizada e ordenados pelo número de membros.
+    nos = np.asarray(nos, dtype=object)
+    particao = np.asarray(particao)
+    betweenness = np.asarray(betweenness, dtype=np.float64)
+
+    ordem = np.lexsort((np.arange(len(particao)), -betweenness, particao))
+    ids, primeira_posicao, tamanhos = np.unique(particao[ordem], return_index=True, return_counts=True)
+
+    df = pd.DataFrame({
+        'id_comunidade': ids,
+        'num_membros': tamanhos,
+        'lider_intermediario_interno': nos[ordem[primeira_posicao]]
+    })
+    return df.sort_values(by='num_membros', ascending=False, kind='stable')
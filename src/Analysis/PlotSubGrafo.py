@@ -1,32 +1,35 @@
 import pandas as pd
 import networkx as nx
 import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pyvis.network import Network
+from CarregadorGrafo import carregar_grafo
 
-def plotar_subgrafo_interativo(no_de_interesse):
+#Limites do renderizador em lote: acima deles, o ego é reduzido aos vizinhos com maior volume de e-mails
+LIMITE_NOS_PADRAO = 300
+LIMITE_ARESTAS_PADRAO = 3000
+
+def plotar_subgrafo_interativo(no_de_interesse, G=None):
+    #G: grafo completo já construído (opcional); se omitido, é obtido via CarregadorGrafo.
     print(f"\n--- Iniciando visualização interativa de subgrafo para: {no_de_interesse} ---")
     
     #Definição dos Caminhos
     script_dir = os.path.dirname(os.path.abspath(__file__))
     root_dir = os.path.abspath(os.path.join(script_dir, '..', '..')) 
 
-    caminho_entrada = os.path.join(root_dir, 'dataSets', 'Outputs', 'EnronEmailsTratados.csv')
-    caminho_saida_html = os.path.join(root_dir, 'dataSets', 'Outputs', f'subgrafo_interativo_{no_de_interesse}.html')
+    caminho_saida_dir = os.path.join(root_dir, 'dataSets', 'Outputs')
+    caminho_saida_html = os.path.join(caminho_saida_dir, f'subgrafo_interativo_{no_de_interesse}.html')
 
     #Carregamento e Criação do Grafo Completo 
-    print("Carregando e criando o grafo completo G...")
-    try:
-        df = pd.read_csv(caminho_entrada)
-    except FileNotFoundError:
-        print(f"ERRO: Arquivo tratado não encontrado em '{caminho_entrada}'.")
-        return
-        
-    G = nx.from_pandas_edgelist(
-        df,
-        'remetente',
-        'destinatario',
-        create_using=nx.DiGraph()
-    )
+    if G is None:
+        print("Carregando e criando o grafo completo G...")
+        try:
+            G = carregar_grafo(caminho_saida_dir)
+        except FileNotFoundError:
+            print(f"ERRO: Dados tratados não encontrados em '{caminho_saida_dir}'.")
+            return
     
     if no_de_interesse not in G:
         print(f"ERRO: Nó '{no_de_interesse}' não existe no grafo. Pulando este nó.")
@@ -62,56 +65,174 @@ def plotar_subgrafo_interativo(no_de_interesse):
     print(f"Grafo interativo salvo em: {caminho_saida_html}")
 
 
+def extrair_ego(G, ator, limite_nos=LIMITE_NOS_PADRAO, limite_arestas=LIMITE_ARESTAS_PADRAO):
+    #Extrai o ego (vizinhos de 1º grau) já reduzido aos limites de nós e arestas.
+    #Vizinhos excedentes são agrupados em um único nó-resumo ligado ao ator.
+    volume = {}
+    for vizinho, dados_aresta in G.succ[ator].items():
+        volume[vizinho] = volume.get(vizinho, 0) + dados_aresta.get('contagem', 1)
+    for vizinho, dados_aresta in G.pred[ator].items():
+        volume[vizinho] = volume.get(vizinho, 0) + dados_aresta.get('contagem', 1)
+    volume.pop(ator, None)
+
+    vizinhos = sorted(volume, key=volume.get, reverse=True)
+    arestas_com_ator = {vizinho: (vizinho in G.succ[ator]) + (vizinho in G.pred[ator]) for vizinho in vizinhos}
+
+    def selecionar(vagas_nos, vagas_arestas):
+        #Vizinhos de maior volume cujas arestas com o ator (1 ou 2) ainda cabem nos limites
+        mantidos, num_arestas = [], 0
+        for vizinho in vizinhos:
+            if len(mantidos) >= vagas_nos or num_arestas + arestas_com_ator[vizinho] > vagas_arestas:
+                break
+            mantidos.append(vizinho)
+            num_arestas += arestas_com_ator[vizinho]
+        return mantidos
+
+    #Se algum vizinho for agrupado, o nó-resumo e sua aresta ocupam uma vaga de cada limite
+    mantidos = selecionar(limite_nos - 1, limite_arestas)
+    if len(mantidos) < len(vizinhos):
+        mantidos = selecionar(limite_nos - 2, limite_arestas - 1)
+    agrupados = vizinhos[len(mantidos):]
+
+    nos = [ator] + mantidos
+    G_sub = G.subgraph(nos)
+
+    #Arestas do ator com os vizinhos mantidos sempre entram; as demais (incluindo um laço do
+    #próprio ator), por volume, até o limite
+    arestas_ator = []
+    arestas_outras = []
+    for u, v, contagem in G_sub.edges(data='contagem', default=1):
+        (arestas_ator if ator in (u, v) and u != v else arestas_outras).append((u, v, contagem))
+    arestas_outras.sort(key=lambda aresta: aresta[2], reverse=True)
+    vagas = max(limite_arestas - (1 if agrupados else 0) - len(arestas_ator), 0)
+    arestas = arestas_ator + arestas_outras[:vagas]
+
+    return {
+        'ator': ator,
+        'nos': nos,
+        'arestas': arestas,
+        'nos_agrupados': len(agrupados),
+        'volume_agrupado': sum(volume[v] for v in agrupados),
+        'arestas_descartadas': len(arestas_outras) - min(vagas, len(arestas_outras)),
+        'nos_totais': len(vizinhos) + 1
+    }
+
+def renderizar_ego(ego, caminho_saida_html):
+    #Layout calculado no servidor (spring layout com semente fixa) e física desligada no navegador
+    inicio = time.perf_counter()
+    ator = ego['ator']
+
+    H = nx.DiGraph()
+    H.add_nodes_from(ego['nos'])
+    H.add_weighted_edges_from(ego['arestas'], weight='contagem')
+    no_resumo = None
+    if ego['nos_agrupados']:
+        no_resumo = f"+{ego['nos_agrupados']} outros"
+        H.add_edge(ator, no_resumo, contagem=ego['volume_agrupado'])
+
+    posicoes = nx.spring_layout(H, seed=42, iterations=50, scale=1000)
+
+    net = Network(height="900px", width="100%", bgcolor="#222222", font_color="white", directed=True)
+    for no in H:
+        x, y = posicoes[no]
+        opcoes = {'x': float(x), 'y': float(y), 'physics': False, 'title': no, 'size': 10}
+        if no == ator:
+            opcoes.update({'color': 'red', 'size': 50})
+        elif no == no_resumo:
+            opcoes.update({'color': 'gray', 'size': 30, 'title': f"{ego['nos_agrupados']} vizinhos agrupados ({ego['volume_agrupado']} e-mails)"})
+        net.add_node(no, label=no, **opcoes)
+    for u, v, contagem in H.edges(data='contagem'):
+        net.add_edge(u, v, value=contagem, title=f"{contagem} e-mail(s)")
+
+    net.toggle_physics(False)
+    net.save_graph(caminho_saida_html)
+
+    return {
+        'ator': ator,
+        'nos_totais': ego['nos_totais'],
+        'nos_renderizados': H.number_of_nodes(),
+        'nos_agrupados': ego['nos_agrupados'],
+        'arestas_renderizadas': H.number_of_edges(),
+        'arestas_descartadas': ego['arestas_descartadas'],
+        'tempo_s': round(time.perf_counter() - inicio, 3),
+        'tamanho_kb': round(os.path.getsize(caminho_saida_html) / 1024, 1)
+    }
+
+def _renderizar_ego_worker(argumentos):
+    return renderizar_ego(*argumentos)
+
+def renderizar_subgrafos_em_lote(G, atores, limite_nos=LIMITE_NOS_PADRAO, limite_arestas=LIMITE_ARESTAS_PADRAO, workers=1):
+    #Extrai todos os egos do mesmo grafo e os renderiza em paralelo, com tamanho de saída limitado.
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    caminho_saida_dir = os.path.abspath(os.path.join(script_dir, '..', '..', 'dataSets', 'Outputs'))
+    caminho_resumo = os.path.join(caminho_saida_dir, 'resumo_subgrafos.csv')
+
+    tarefas = []
+    for ator in atores:
+        if ator not in G:
+            print(f"ERRO: Nó '{ator}' não existe no grafo. Pulando este nó.")
+            continue
+        ego = extrair_ego(G, ator, limite_nos, limite_arestas)
+        tarefas.append((ego, os.path.join(caminho_saida_dir, f'subgrafo_interativo_{ator}.html')))
+
+    print(f"Renderizando {len(tarefas)} subgrafos com {workers} worker(s) (limite de {limite_nos} nós e {limite_arestas} arestas)...")
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            resumo = list(executor.map(_renderizar_ego_worker, tarefas))
+    else:
+        resumo = [renderizar_ego(*tarefa) for tarefa in tarefas]
+
+    df_resumo = pd.DataFrame(resumo)
+    if not df_resumo.empty:
+        df_resumo.to_csv(caminho_resumo, index=False)
+        print(df_resumo.to_string(index=False))
+        print(f"Resumo dos subgrafos salvo em: {caminho_resumo}")
+
+    return df_resumo
+
+
+def ler_atores_centrais(caminho_saida_dir):
+    #Atores do Top 10 de Betweenness, PageRank e Closeness calculados pela AnaliseEstatica,
+    #sem repetição e na ordem dos rankings.
+    arquivos = ['top10_intermediarios.csv', 'top10_pagerank.csv', 'top10_closeness.csv']
+    lista_combinada = []
+    for arquivo in arquivos:
+        df_top10 = pd.read_csv(os.path.join(caminho_saida_dir, arquivo))
+        lista_combinada.extend(df_top10.iloc[:, 0].tolist())
+    return list(dict.fromkeys(lista_combinada))
+
+
 if __name__ == "__main__":
     
-    #Lista 1: Top 10 Betweenness
-    list_betweenness = [
-        'jeff.dasovich@enron.com',
-        'tana.jones@enron.com',
-        'vince.kaminski@enron.com',
-        'sara.shackleton@enron.com',
-        'gerald.nemec@enron.com',
-        'sally.beck@enron.com',
-        'louise.kitchen@enron.com',
-        'kenneth.lay@enron.com',
-        'jeff.skilling@enron.com',
-        'kay.mann@enron.com'
-    ]
-    
-    #Lista 2: Top 10 PageRank
-    list_pagerank = [
-        'klay@enron.com',
-        'jeff.skilling@enron.com',
-        'kenneth.lay@enron.com',
-        'sara.shackleton@enron.com',
-        'tana.jones@enron.com',
-        'ebass@enron.com',
-        'louise.kitchen@enron.com',
-        'jeff.dasovich@enron.com',
-        'sally.beck@enron.com',
-        'gerald.nemec@enron.com'
-    ]
-    
-    #Lista 3: Top 10 Closeness
-    list_closeness = [
-        'louise.kitchen@enron.com',
-        'john.lavorato@enron.com',
-        'sally.beck@enron.com',
-        'tim.belden@enron.com',
-        'greg.whalley@enron.com',
-        'kenneth.lay@enron.com',
-        'david.delainey@enron.com',
-        'jeff.skilling@enron.com',
-        'tana.jones@enron.com',
-        'elizabeth.sager@enron.com'
-    ]
-    
-    lista_combinada = list_betweenness + list_pagerank + list_closeness
-    atores_unicos = set(lista_combinada)
+    parser = argparse.ArgumentParser(description="Geração dos subgrafos interativos dos atores centrais.")
+    parser.add_argument('--limite-nos', type=int, default=LIMITE_NOS_PADRAO,
+                        help="Máximo de nós por subgrafo; os vizinhos excedentes são agrupados em um nó-resumo.")
+    parser.add_argument('--limite-arestas', type=int, default=LIMITE_ARESTAS_PADRAO,
+                        help="Máximo de arestas por subgrafo, incluindo as do ator e a do nó-resumo.")
+    parser.add_argument('--workers', type=int, default=1, help="Processos usados na renderização.")
+    args = parser.parse_args()
+    #O menor subgrafo possível é o ator ligado ao nó-resumo
+    if args.limite_nos < 2 or args.limite_arestas < 1:
+        parser.error("--limite-nos deve ser pelo menos 2 e --limite-arestas pelo menos 1.")
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    caminho_saida_dir = os.path.abspath(os.path.join(script_dir, '..', '..', 'dataSets', 'Outputs'))
+
+    try:
+        atores_unicos = ler_atores_centrais(caminho_saida_dir)
+    except FileNotFoundError as e:
+        print(f"ERRO: Rankings não encontrados ({e.filename}). Execute 'AnaliseEstatica.py' antes.")
+        raise SystemExit(1)
     
     print(f"--- Iniciando a geração de {len(atores_unicos)} subgrafos interativos ---")
+
+    #O grafo completo é construído uma única vez e compartilhado por todos os subgrafos
+    try:
+        G = carregar_grafo(caminho_saida_dir)
+    except FileNotFoundError:
+        print(f"ERRO: Dados tratados não encontrados em '{caminho_saida_dir}'.")
+        raise SystemExit(1)
     
-    for ator in atores_unicos:
-        plotar_subgrafo_interativo(no_de_interesse=ator)
+    renderizar_subgrafos_em_lote(G, atores_unicos, args.limite_nos, args.limite_arestas, args.workers)
         
     print(f"\n--- Geração de subgrafos concluída. {len(atores_unicos)} arquivos .html foram criados na pasta 'dataSets/Outputs/'. ---")
\ No newline at end of file
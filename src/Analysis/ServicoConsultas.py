@@ -0,0 +1,270 @@
+import pandas as pd
+import numpy as np
+import os
+import copy
+import time
+import shlex
+import argparse
+from collections import OrderedDict, deque
+from CarregadorGrafo import carregar_arestas
+
+#Serviço de consultas pontuais sobre a rede: quem enviou para X, quem recebeu de X,
+#em qual período, e como A e B se conectam através de intermediários.
+
+TAMANHO_CACHE_PADRAO = 1024
+
+class CacheLRU:
+    def __init__(self, capacidade):
+        self.capacidade = capacidade
+        self.itens = OrderedDict()
+
+    def obter(self, chave):
+        if chave in self.itens:
+            self.itens.move_to_end(chave)
+            return True, self.itens[chave]
+        return False, None
+
+    def guardar(self, chave, valor):
+        self.itens[chave] = valor
+        self.itens.move_to_end(chave)
+        if len(self.itens) > self.capacidade:
+            self.itens.popitem(last=False)
+
+def construir_indice(chave, outro, timestamp, n):
+    #Índice no estilo CSR: as interações de cada nó ficam contíguas e ordenadas por data,
+    #permitindo recortar um período com busca binária.
+    ordem = np.lexsort((timestamp, chave))
+    ponteiros = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(chave, minlength=n), out=ponteiros[1:])
+    return ponteiros, np.asarray(outro)[ordem], np.asarray(timestamp)[ordem]
+
+class ServicoConsultas:
+    #Carrega o armazenamento de arestas uma única vez e mantém índices direto (enviados) e
+    #reverso (recebidos) com as datas de cada interação.
+    def __init__(self, caminho_saida_dir, tamanho_cache=TAMANHO_CACHE_PADRAO):
+        inicio = time.perf_counter()
+        enderecos, origem, destino, timestamp = carregar_arestas(caminho_saida_dir)
+        origem = np.asarray(origem)
+        destino = np.asarray(destino)
+        timestamp = np.asarray(timestamp)
+
+        self.enderecos = enderecos
+        self.ids = {endereco: i for i, endereco in enumerate(enderecos)}
+        n = len(enderecos)
+
+        self.enviados = construir_indice(origem, destino, timestamp, n)
+        self.recebidos = construir_indice(destino, origem, timestamp, n)
+
+        self.cache = CacheLRU(tamanho_cache)
+        self.latencias = {}
+        print(f"Índices construídos para {n} endereços e {len(origem)} interações em {time.perf_counter() - inicio:.2f}s")
+
+    def _id(self, endereco):
+        endereco = endereco.strip().lower()
+        if endereco not in self.ids:
+            raise KeyError(f"Endereço '{endereco}' não existe na rede.")
+        return self.ids[endereco]
+
+    def _vizinhos(self, indice, no, inicio=None, fim=None):
+        #Interações com data em [inicio, fim)
+        ponteiros, vizinhos, datas = indice
+        a, b = ponteiros[no], ponteiros[no + 1]
+        if inicio is not None:
+            a += np.searchsorted(datas[a:b], inicio, side='left')
+        if fim is not None:
+            b = ponteiros[no] + np.searchsorted(datas[ponteiros[no]:b], fim, side='left')
+        return vizinhos[a:b], datas[a:b]
+
+    def _executar(self, tipo, chave, funcao):
+        #Quem chama recebe sempre uma cópia: alterações no resultado não chegam ao cache
+        inicio = time.perf_counter()
+        encontrado, resultado = self.cache.obter((tipo,) + chave)
+        if not encontrado:
+            resultado = funcao()
+            self.cache.guardar((tipo,) + chave, resultado)
+        resultado = copy.deepcopy(resultado)
+        self.latencias.setdefault(tipo, []).append((time.perf_counter() - inicio) * 1000)
+        return resultado
+
+    def vizinhos(self, endereco, direcao='enviou', inicio=None, fim=None):
+        #Contatos de um endereço no período [inicio, fim] (datas 'AAAA-MM-DD'), com número de
+        #e-mails e primeira/última interação. direcao: 'enviou' (X -> ?) ou 'recebeu' (? -> X).
+        def consultar():
+            indice = self.enviados if direcao == 'enviou' else self.recebidos
+            ts_inicio = int(pd.Timestamp(inicio, tz='UTC').timestamp()) if inicio else None
+            #O dia de fim entra por inteiro: o limite exclusivo é a meia-noite do dia seguinte
+            ts_fim = int((pd.Timestamp(fim, tz='UTC').normalize() + pd.Timedelta(days=1)).timestamp()) if fim else None
+            vizinhos, datas = self._vizinhos(indice, self._id(endereco), ts_inicio, ts_fim)
+
+            df = pd.DataFrame({'contato': self.enderecos[vizinhos], 'data': datas})
+            resumo = df.groupby('contato')['data'].agg(contagem='size', primeira='min', ultima='max')
+            resumo['primeira'] = pd.to_datetime(resumo['primeira'], unit='s', utc=True)
+            resumo['ultima'] = pd.to_datetime(resumo['ultima'], unit='s', utc=True)
+            return resumo.sort_values(by='contagem', ascending=False)
+
+        return self._executar('vizinhos', (endereco, direcao, inicio, fim), consultar)
+
+    def _adjacentes(self, no):
+        #Contatos em qualquer direção (a rede é tratada como não direcionada para ego e caminhos)
+        ponteiros_env, destinos, _ = self.enviados
+        ponteiros_rec, origens, _ = self.recebidos
+        return np.union1d(
+            destinos[ponteiros_env[no]:ponteiros_env[no + 1]],
+            origens[ponteiros_rec[no]:ponteiros_rec[no + 1]]
+        )
+
+    def ego(self, endereco, k=1):
+        #Endereços a até k saltos, com a distância de cada um
+        def consultar():
+            origem = self._id(endereco)
+            distancias = {origem: 0}
+            fronteira = [origem]
+            for nivel in range(1, k + 1):
+                proxima = []
+                for no in fronteira:
+                    for vizinho in self._adjacentes(no).tolist():
+                        if vizinho not in distancias:
+                            distancias[vizinho] = nivel
+                            proxima.append(vizinho)
+                fronteira = proxima
+            return {self.enderecos[no]: d for no, d in distancias.items()}
+
+        return self._executar('ego', (endereco, k), consultar)
+
+    def caminho(self, endereco_a, endereco_b, direcionado=False):
+        #Caminho mais curto de A até B (BFS bidirecional). Com direcionado=True, segue apenas
+        #o sentido remetente -> destinatário. Retorna a lista de endereços ou None.
+        def consultar():
+            a, b = self._id(endereco_a), self._id(endereco_b)
+            if a == b:
+                return [self.enderecos[a]]
+
+            if direcionado:
+                ponteiros_env, destinos, _ = self.enviados
+                ponteiros_rec, origens, _ = self.recebidos
+                avancar = lambda no: destinos[ponteiros_env[no]:ponteiros_env[no + 1]]
+                recuar = lambda no: origens[ponteiros_rec[no]:ponteiros_rec[no + 1]]
+            else:
+                avancar = recuar = self._adjacentes
+
+            pais_a, pais_b = {a: None}, {b: None}
+            fila_a, fila_b = deque([a]), deque([b])
+            encontro = None
+
+            while fila_a and fila_b and encontro is None:
+                #Expande sempre o lado com a menor fronteira
+                if len(fila_a) <= len(fila_b):
+                    fila, pais, outros, vizinhos_de = fila_a, pais_a, pais_b, avancar
+                else:
+                    fila, pais, outros, vizinhos_de = fila_b, pais_b, pais_a, recuar
+                for _ in range(len(fila)):
+                    no = fila.popleft()
+                    for vizinho in np.unique(vizinhos_de(no)).tolist():
+                        if vizinho not in pais:
+                            pais[vizinho] = no
+                            fila.append(vizinho)
+                            if vizinho in outros:
+                                encontro = vizinho
+                                break
+                    if encontro is not None:
+                        break
+
+            if encontro is None:
+                return None
+
+            caminho_a = []
+            no = encontro
+            while no is not None:
+                caminho_a.append(no)
+                no = pais_a[no]
+            caminho_b = []
+            no = pais_b[encontro]
+            while no is not None:
+                caminho_b.append(no)
+                no = pais_b[no]
+            return [self.enderecos[no] for no in reversed(caminho_a)] + [self.enderecos[no] for no in caminho_b]
+
+        return self._executar('caminho', (endereco_a, endereco_b, direcionado), consultar)
+
+    def relatorio_latencias(self):
+        #Percentis de latência (ms) por tipo de consulta, incluindo as respondidas pelo cache
+        linhas = []
+        for tipo, valores in self.latencias.items():
+            valores = np.array(valores)
+            linhas.append({
+                'consulta': tipo,
+                'total': len(valores),
+                'p50_ms': np.percentile(valores, 50),
+                'p95_ms': np.percentile(valores, 95),
+                'p99_ms': np.percentile(valores, 99),
+                'max_ms': valores.max()
+            })
+        return pd.DataFrame(linhas)
+
+def executar_comando(servico, argumentos):
+    comando = argumentos[0]
+    if comando == 'enviou' or comando == 'recebeu':
+        inicio = argumentos[2] if len(argumentos) > 2 else None
+        fim = argumentos[3] if len(argumentos) > 3 else None
+        print(servico.vizinhos(argumentos[1], comando, inicio, fim).to_string())
+    elif comando == 'ego':
+        k = int(argumentos[2]) if len(argumentos) > 2 else 1
+        resultado = servico.ego(argumentos[1], k)
+        print(f"{len(resultado)} endereços a até {k} salto(s):")
+        for endereco, distancia in sorted(resultado.items(), key=lambda item: item[1]):
+            print(f"  {distancia}  {endereco}")
+    elif comando == 'caminho':
+        direcionado = len(argumentos) > 3 and argumentos[3] == 'direcionado'
+        resultado = servico.caminho(argumentos[1], argumentos[2], direcionado)
+        print(' -> '.join(resultado) if resultado else "Nenhum caminho encontrado.")
+    elif comando == 'latencias':
+        print(servico.relatorio_latencias().to_string(index=False))
+    else:
+        print("Comandos: enviou X [inicio] [fim] | recebeu X [inicio] [fim] | ego X [k] | "
+              "caminho A B [direcionado] | latencias | sair")
+
+def iniciar_servico(comando=None, tamanho_cache=TAMANHO_CACHE_PADRAO):
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    caminho_saida_dir = os.path.abspath(os.path.join(script_dir, '..', '..', 'dataSets', 'Outputs'))
+
+    try:
+        servico = ServicoConsultas(caminho_saida_dir, tamanho_cache)
+    except FileNotFoundError:
+        print(f"ERRO: Dados tratados não encontrados em '{caminho_saida_dir}'.")
+        return None
+
+    if comando:
+        try:
+            executar_comando(servico, comando)
+        except (KeyError, IndexError, ValueError) as e:
+            print(f"ERRO: {e}")
+        return servico
+
+    #Modo interativo: os índices ficam em memória enquanto o serviço estiver aberto
+    executar_comando(servico, ['ajuda'])
+    while True:
+        try:
+            linha = input("consulta> ").strip()
+        except EOFError:
+            break
+        if not linha:
+            continue
+        if linha in ('sair', 'exit', 'quit'):
+            break
+        try:
+            executar_comando(servico, shlex.split(linha))
+        except (KeyError, IndexError, ValueError) as e:
+            print(f"ERRO: {e}")
+
+    print(servico.relatorio_latencias().to_string(index=False))
+    return servico
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serviço de consultas pontuais sobre a rede de e-mails.")
+    parser.add_argument('comando', nargs='*',
+                        help="Consulta única (ex.: 'ego kenneth.lay@enron.com 2'); sem argumentos, abre o modo interativo.")
+    parser.add_argument('--tamanho-cache', type=int, default=TAMANHO_CACHE_PADRAO,
+                        help="Número de consultas mantidas no cache LRU.")
+    args = parser.parse_args()
+
+    iniciar_servico(args.comando, args.tamanho_cache)
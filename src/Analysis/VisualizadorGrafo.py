@@ -1,77 +1,206 @@
-import pandas as pd
-import networkx as nx
 import os
+import json
+import argparse
+from CarregadorGrafo import carregar_grafo
 
-def exportar_estrutura_grafo_txt():
+TAMANHO_BUFFER_ESCRITA = 1 << 20
+
+def formatar_registro_txt(node, predecessores, sucessores):
+    linhas = [
+        "==================================================\n",
+        f" NÓ (PESSOA): {node}\n",
+        "==================================================\n\n",
+        "--> RECEBEU E-MAIL DE (Predecessores):\n"
+    ]
+    if predecessores:
+        linhas.extend(f"    - {predecessor}\n" for predecessor in predecessores)
+    else:
+        linhas.append("    (Nenhum)\n")
+
+    linhas.append("\n")
+
+    linhas.append("--> ENVIOU E-MAIL PARA (Sucessores):\n")
+    if sucessores:
+        linhas.extend(f"    - {sucessor}\n" for sucessor in sucessores)
+    else:
+        linhas.append("    (Nenhum)\n")
+
+    linhas.append("\n\n")
+    return ''.join(linhas)
+
+def formatar_registro_jsonl(node, predecessores, sucessores):
+    registro = {'no': node, 'recebeu_de_predecessores': predecessores, 'enviou_para_sucessores': sucessores}
+    return json.dumps(registro, ensure_ascii=False) + "\n"
+
+def nome_shard_prefixo(node):
+    inicial = str(node)[:1].lower()
+    return f"prefixo_{inicial}" if inicial.isalnum() else "prefixo_outros"
+
+def agrupar_em_shards(G, particionar_por, particao=None):
+    #Agrupa apenas as referências dos nós por arquivo de saída, mantendo a ordem original do grafo
+    shards = {}
+    for node in G:
+        if particionar_por == 'prefixo':
+            nome = nome_shard_prefixo(node)
+        elif particionar_por == 'comunidade':
+            comunidade = particao.get(node)
+            nome = f"comunidade_{comunidade}" if comunidade is not None else "comunidade_sem_id"
+        else:
+            nome = None
+        shards.setdefault(nome, []).append(node)
+    return shards
+
+def remover_exportacoes_antigas(caminho_saida_txt, caminho_saida_shards, extensao, arquivos_atuais):
+    #Remove os arquivos deste formato que não fazem parte da exportação atual (ex.: shards de uma
+    #execução anterior com outro --particionar-por), para que não se misturem com os novos
+    candidatos = [caminho_saida_txt]
+    if os.path.isdir(caminho_saida_shards):
+        candidatos += [os.path.join(caminho_saida_shards, nome) for nome in os.listdir(caminho_saida_shards)
+                       if nome.endswith(f'.{extensao}')]
+    for caminho in candidatos:
+        if caminho not in arquivos_atuais and os.path.exists(caminho):
+            os.remove(caminho)
+
+def exportar_estrutura_grafo_txt(G=None, formato='txt', particionar_por=None):
+    #G: grafo já construído (opcional); se omitido, é obtido via CarregadorGrafo.
+    #formato: 'txt' (legível) ou 'jsonl' (um registro JSON por linha).
+    #particionar_por: None (arquivo único), 'prefixo' (inicial do endereço) ou 'comunidade' (comunidades_estaticas.json).
 
     print("Iniciando a exportação da estrutura do grafo para validação...")
 
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    root_dir = os.path.abspath(os.path.join(script_dir, '..', '..')) 
-
-    caminho_entrada = os.path.join(root_dir, 'dataSets', 'Outputs', 'EnronEmailsTratados.csv')
-    caminho_saida_txt = os.path.join(root_dir, 'dataSets', 'Outputs', 'visualizador_grafo.txt')
-
-    print(f"Carregando dados tratados de: {caminho_entrada}")
-    try:
-        df = pd.read_csv(caminho_entrada)
-    except FileNotFoundError:
-        print(f"ERRO: Arquivo tratado não encontrado em '{caminho_entrada}'.")
-        return
-        
-    G = nx.from_pandas_edgelist(
-        df,
-        'remetente',
-        'destinatario',
-        create_using=nx.DiGraph()
-    )
-    
+    root_dir = os.path.abspath(os.path.join(script_dir, '..', '..'))
+
+    caminho_saida_dir = os.path.join(root_dir, 'dataSets', 'Outputs')
+    extensao = 'jsonl' if formato == 'jsonl' else 'txt'
+    caminho_saida_txt = os.path.join(caminho_saida_dir, f'visualizador_grafo.{extensao}')
+    caminho_saida_shards = os.path.join(caminho_saida_dir, 'visualizador_grafo')
+    caminho_indice = os.path.join(caminho_saida_dir, f'visualizador_grafo_{extensao}.indice.tsv')
+    caminho_comunidades = os.path.join(caminho_saida_dir, 'comunidades_estaticas.json')
+    caminho_manifesto = os.path.join(caminho_saida_dir, 'visualizador_grafo_manifesto.json')
+
+    if G is None:
+        try:
+            G = carregar_grafo(caminho_saida_dir)
+        except FileNotFoundError:
+            print(f"ERRO: Dados tratados não encontrados em '{caminho_saida_dir}'.")
+            return
+
     print(f"Grafo construído com {G.number_of_nodes()} nós e {G.number_of_edges()} arestas.")
 
-    #Extração da Estrutura do Grafo
-    print("Extraindo predecessores e sucessores de cada nó...")
-    
-    estrutura_grafo = {}
-    for node in G.nodes():
-        predecessores = list(G.predecessors(node))
-        sucessores = list(G.successors(node))
-        
-        estrutura_grafo[node] = {
-            'recebeu_de_predecessores': predecessores,
-            'enviou_para_sucessores': sucessores
-        }
-    
-    print("Extração concluída.")
-
-    print(f"Salvando a estrutura do grafo em: {caminho_saida_txt}")
-    
-    with open(caminho_saida_txt, 'w', encoding='utf-8') as f:
-        
-        for node, data in estrutura_grafo.items():
-            
-            f.write("==================================================\n")
-            f.write(f" NÓ (PESSOA): {node}\n")
-            f.write("==================================================\n\n")
-            
-            f.write("--> RECEBEU E-MAIL DE (Predecessores):\n")
-            if data['recebeu_de_predecessores']:
-                for predecessor in data['recebeu_de_predecessores']:
-                    f.write(f"    - {predecessor}\n")
-            else:
-                f.write("    (Nenhum)\n")
-            
-            f.write("\n") 
-    
-            f.write("--> ENVIOU E-MAIL PARA (Sucessores):\n")
-            if data['enviou_para_sucessores']:
-                for sucessor in data['enviou_para_sucessores']:
-                    f.write(f"    - {sucessor}\n")
-            else:
-                f.write("    (Nenhum)\n")
-            
-            f.write("\n\n") 
-        
-    print(f"\nArquivo de validação '{os.path.basename(caminho_saida_txt)}' foi criado.")
+    particao = None
+    if particionar_por == 'comunidade':
+        try:
+            with open(caminho_comunidades, 'r') as f:
+                particao = json.load(f)
+        except FileNotFoundError:
+            print(f"ERRO: '{caminho_comunidades}' não encontrado. Execute 'AnaliseEstatica.py' antes de particionar por comunidade.")
+            return
+
+    formatar_registro = formatar_registro_jsonl if formato == 'jsonl' else formatar_registro_txt
+    shards = agrupar_em_shards(G, particionar_por, particao)
+
+    if particionar_por:
+        os.makedirs(caminho_saida_shards, exist_ok=True)
+        print(f"Salvando a estrutura do grafo em {len(shards)} arquivos em: {caminho_saida_shards}")
+    else:
+        print(f"Salvando a estrutura do grafo em: {caminho_saida_txt}")
+
+    #Cada registro é escrito direto da adjacência, sem cópia prévia da estrutura inteira,
+    #e sua posição em bytes vai para o índice (nó, arquivo, offset, tamanho).
+    entradas_indice = []
+    arquivos_atuais = set()
+    for nome_shard, nos in shards.items():
+        if nome_shard is None:
+            caminho_arquivo = caminho_saida_txt
+        else:
+            caminho_arquivo = os.path.join(caminho_saida_shards, f'{nome_shard}.{extensao}')
+        arquivos_atuais.add(caminho_arquivo)
+        caminho_relativo = os.path.relpath(caminho_arquivo, caminho_saida_dir)
+
+        offset = 0
+        with open(caminho_arquivo, 'wb', buffering=TAMANHO_BUFFER_ESCRITA) as f:
+            for node in nos:
+                dados = formatar_registro(node, list(G.predecessors(node)), list(G.successors(node))).encode('utf-8')
+                f.write(dados)
+                entradas_indice.append((str(node).encode('utf-8'), caminho_relativo, offset, len(dados)))
+                offset += len(dados)
+
+    remover_exportacoes_antigas(caminho_saida_txt, caminho_saida_shards, extensao, arquivos_atuais)
+
+    #O índice é gravado ordenado pelos bytes do nó, o que permite a busca binária em buscar_registro
+    entradas_indice.sort(key=lambda entrada: entrada[0])
+    with open(caminho_indice, 'wb') as indice:
+        indice.write(b"no\tarquivo\toffset\ttamanho\n")
+        for node, caminho_relativo, offset, tamanho in entradas_indice:
+            indice.write(node + f"\t{caminho_relativo}\t{offset}\t{tamanho}\n".encode('utf-8'))
+
+    #Manifesto com os arquivos gerados nesta execução (relativos à raiz do projeto), usado pelo
+    #pipeline para saber quais saídas verificar, já que elas dependem do formato e do particionamento
+    with open(caminho_manifesto, 'w', encoding='utf-8') as f:
+        json.dump(sorted(os.path.relpath(caminho, root_dir).replace(os.sep, '/') for caminho in arquivos_atuais | {caminho_indice}), f, indent=4)
+
+    print(f"Índice de posições salvo em: {caminho_indice}")
+    if particionar_por:
+        print(f"\nArquivos de validação criados em '{os.path.basename(caminho_saida_shards)}/'.")
+    else:
+        print(f"\nArquivo de validação '{os.path.basename(caminho_saida_txt)}' foi criado.")
+
+def buscar_linha_indice(indice, chave):
+    #Busca binária sobre as posições em bytes do índice ordenado: encontra a primeira linha
+    #com nó >= chave lendo O(log n) linhas, sem carregar o índice em memória
+    indice.seek(0)
+    inicio_dados = len(indice.readline())
+    baixo, alto = inicio_dados, indice.seek(0, os.SEEK_END)
+
+    def primeira_linha_a_partir(posicao):
+        #Linha que começa na posição ou logo depois dela
+        indice.seek(posicao - 1)
+        indice.readline()
+        return indice.readline()
+
+    while baixo < alto:
+        meio = (baixo + alto) // 2
+        linha = primeira_linha_a_partir(meio)
+        if not linha or linha.split(b"\t", 1)[0] >= chave:
+            alto = meio
+        else:
+            baixo = meio + 1
+
+    linha = primeira_linha_a_partir(baixo)
+    if linha and linha.split(b"\t", 1)[0] == chave:
+        return linha
+    return None
+
+def buscar_registro(no, formato='txt'):
+    #Lê o registro de um único nó a partir do índice, sem percorrer o arquivo exportado
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    caminho_saida_dir = os.path.abspath(os.path.join(script_dir, '..', '..', 'dataSets', 'Outputs'))
+    extensao = 'jsonl' if formato == 'jsonl' else 'txt'
+    caminho_indice = os.path.join(caminho_saida_dir, f'visualizador_grafo_{extensao}.indice.tsv')
+
+    with open(caminho_indice, 'rb') as indice:
+        linha = buscar_linha_indice(indice, no.encode('utf-8'))
+    if linha is None:
+        return None
+
+    _, caminho_relativo, offset, tamanho = linha.decode('utf-8').rstrip("\n").split("\t")
+    with open(os.path.join(caminho_saida_dir, caminho_relativo), 'rb') as f:
+        f.seek(int(offset))
+        return f.read(int(tamanho)).decode('utf-8')
 
 if __name__ == "__main__":
-    exportar_estrutura_grafo_txt()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Exportação da estrutura do grafo (predecessores e sucessores de cada nó).")
+    parser.add_argument('--formato', default='txt', choices=['txt', 'jsonl'],
+                        help="Formato de saída: texto legível ou JSON por linha.")
+    parser.add_argument('--particionar-por', default=None, choices=['prefixo', 'comunidade'],
+                        help="Divide a saída em arquivos por inicial do endereço ou por comunidade.")
+    parser.add_argument('--buscar', default=None, metavar='NO',
+                        help="Em vez de exportar, mostra o registro de um nó usando o índice existente.")
+    args = parser.parse_args()
+
+    if args.buscar:
+        registro = buscar_registro(args.buscar, args.formato)
+        print(registro if registro is not None else f"Nó '{args.buscar}' não encontrado no índice.")
+    else:
+        exportar_estrutura_grafo_txt(formato=args.formato, particionar_por=args.particionar_por)
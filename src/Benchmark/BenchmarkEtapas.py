@@ -0,0 +1,227 @@
+import pandas as pd
+import numpy as np
+import networkx as nx
+import os
+import sys
+import json
+import time
+import platform
+import tempfile
+import tracemalloc
+import argparse
+import subprocess
+from contextlib import redirect_stdout
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+#Benchmark por etapa do pipeline: tempo e memória de cada etapa, medidos com as mesmas funções
+#usadas pelos scripts, sobre um CSV no formato do EnronEmails.csv (real ou sintético).
+script_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(script_dir, '..', '..'))
+sys.path.insert(0, os.path.join(root_dir, 'src', 'DataTreatment'))
+sys.path.insert(0, os.path.join(root_dir, 'src', 'Analysis'))
+
+from PreProcessamento import (extrair_campos, normalizar_destinatarios, filtrar_periodo, converter_periodo,
+                              DATA_INICIO_PADRAO, DATA_FIM_PADRAO)
+from ArmazenamentoArestas import codificar_interacoes, salvar_armazenamento
+from CarregadorGrafo import construir_grafo
+from AnaliseEstatica import calcular_betweenness
+from CentralidadeEsparsa import grafo_para_csr, pagerank_csr, closeness_csr
+from DeteccaoComunidades import detectar_comunidades
+from AnaliseDisrupcao import preparar_estrutura_componentes, simular_ataque, simular_falhas_aleatorias
+from PlotSubGrafo import extrair_ego, renderizar_ego
+from GeradorCaixaPostal import gerar_caixa_postal
+
+#Variação acima da qual uma etapa é apontada como regressão na comparação entre execuções
+LIMIAR_REGRESSAO = 1.2
+
+class MedidorEtapas:
+    #Executa cada etapa medindo tempo (perf_counter) e pico de memória alocada pelo Python (tracemalloc).
+    #O tracemalloc deixa o código Python mais lento; com medir_memoria=False apenas o tempo é medido.
+    def __init__(self, medir_memoria=True, silencioso=True):
+        self.medir_memoria = medir_memoria
+        self.silencioso = silencioso
+        self.etapas = []
+
+    def medir(self, nome, funcao, *args, **kwargs):
+        print(f"  Etapa '{nome}'...", end=' ', flush=True)
+        if self.medir_memoria:
+            tracemalloc.start()
+
+        inicio = time.perf_counter()
+        if self.silencioso:
+            with open(os.devnull, 'w') as nulo, redirect_stdout(nulo):
+                resultado = funcao(*args, **kwargs)
+        else:
+            resultado = funcao(*args, **kwargs)
+        duracao = time.perf_counter() - inicio
+
+        registro = {'etapa': nome, 'tempo_s': round(duracao, 4)}
+        if self.medir_memoria:
+            atual, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            registro['memoria_pico_mb'] = round(pico / 2**20, 2)
+            registro['memoria_retida_mb'] = round(atual / 2**20, 2)
+
+        self.etapas.append(registro)
+        print(f"{duracao:.3f}s" + (f", pico de {registro['memoria_pico_mb']:.1f} MB" if self.medir_memoria else ""))
+        return resultado
+
+def versao_codigo():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=root_dir,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def executar_benchmark(caminho_entrada, amostras_betweenness=None, backend='networkx', num_egos=3, medir_memoria=True,
+                       inicio=DATA_INICIO_PADRAO, fim=DATA_FIM_PADRAO):
+    #amostras_betweenness: None = Brandes exato (inviável nas escalas maiores; use algumas centenas de pivôs).
+    #backend: 'networkx' ou 'esparso' para PageRank e Closeness (ver CentralidadeEsparsa).
+    medidor = MedidorEtapas(medir_memoria)
+    start_date, end_date = converter_periodo(inicio, fim)
+
+    print(f"--- Benchmark por etapa: {caminho_entrada} ---")
+
+    #Pré-processamento
+    df = medidor.medir('leitura_csv', pd.read_csv, caminho_entrada)
+    num_mensagens = len(df)
+    df_limpo = medidor.medir('extracao_cabecalhos', extrair_campos, df)
+    del df
+    df_limpo = medidor.medir('filtro_periodo', filtrar_periodo, df_limpo, start_date, end_date)
+    df_final = medidor.medir('explode_destinatarios', normalizar_destinatarios, df_limpo)
+    del df_limpo
+
+    indice_enderecos = {}
+    origem, destino, timestamp = medidor.medir('codificacao_ids', codificar_interacoes, df_final, indice_enderecos)
+    num_interacoes = len(df_final)
+    del df_final
+
+    with tempfile.TemporaryDirectory() as dir_temp:
+        medidor.medir('agregacao_e_gravacao', salvar_armazenamento, dir_temp, indice_enderecos, origem, destino, timestamp)
+        G = medidor.medir('construcao_grafo', construir_grafo, dir_temp)
+
+        #Centralidades da AnaliseEstatica
+        medidor.medir('grau', lambda: (dict(G.in_degree()), dict(G.out_degree())))
+        betweenness, _ = medidor.medir('betweenness', calcular_betweenness, G, amostras_betweenness)
+
+        if backend == 'esparso':
+            _, A = medidor.medir('conversao_csr', grafo_para_csr, G)
+            medidor.medir('pagerank', pagerank_csr, A, 0.85)
+            medidor.medir('closeness', closeness_csr, A)
+        else:
+            medidor.medir('pagerank', nx.pagerank, G, 0.85)
+            medidor.medir('closeness', nx.closeness_centrality, G)
+
+        medidor.medir('louvain', detectar_comunidades, G)
+
+        #Disrupção com os 10 maiores intermediários, como na AnaliseDisrupcao
+        alvos = sorted(betweenness, key=betweenness.get, reverse=True)[:10]
+        estrutura = medidor.medir('estrutura_componentes', preparar_estrutura_componentes, G)
+        medidor.medir('simular_ataque', simular_ataque, G, alvos, 'Benchmark', estrutura)
+        medidor.medir('falhas_aleatorias', simular_falhas_aleatorias, estrutura, len(alvos), 50)
+
+        #Renderização pyvis dos egos dos atores mais centrais
+        def renderizar_egos():
+            for ator in alvos[:num_egos]:
+                ego = extrair_ego(G, ator)
+                renderizar_ego(ego, os.path.join(dir_temp, f'ego_{ator}.html'))
+        medidor.medir('renderizacao_pyvis', renderizar_egos)
+
+        resumo_grafo = {'nos': G.number_of_nodes(), 'arestas': G.number_of_edges()}
+
+    return {
+        'versao': versao_codigo(),
+        'data_execucao': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'parametros': {
+            'entrada': os.path.basename(caminho_entrada),
+            'amostras_betweenness': amostras_betweenness,
+            'backend': backend,
+            'num_egos': num_egos,
+            'medir_memoria': medir_memoria,
+            'periodo': [inicio, fim]
+        },
+        'dados': {'mensagens': num_mensagens, 'interacoes': num_interacoes, **resumo_grafo},
+        'etapas': medidor.etapas,
+        'tempo_total_s': round(sum(etapa['tempo_s'] for etapa in medidor.etapas), 4),
+        'memoria_max_processo_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1) if resource else None
+    }
+
+def comparar_resultados(atual, anterior, limiar=LIMIAR_REGRESSAO):
+    #Razão atual/anterior de tempo e memória por etapa; acima do limiar, a etapa é marcada como regressão
+    etapas_anteriores = {etapa['etapa']: etapa for etapa in anterior['etapas']}
+    linhas = []
+    for etapa in atual['etapas']:
+        referencia = etapas_anteriores.get(etapa['etapa'])
+        if referencia is None:
+            continue
+        linha = {
+            'etapa': etapa['etapa'],
+            'tempo_anterior_s': referencia['tempo_s'],
+            'tempo_atual_s': etapa['tempo_s'],
+            'razao_tempo': round(etapa['tempo_s'] / referencia['tempo_s'], 2) if referencia['tempo_s'] > 0 else np.nan
+        }
+        if 'memoria_pico_mb' in etapa and 'memoria_pico_mb' in referencia:
+            linha['razao_memoria'] = round(etapa['memoria_pico_mb'] / referencia['memoria_pico_mb'], 2) if referencia['memoria_pico_mb'] > 0 else np.nan
+        linha['regressao'] = linha['razao_tempo'] > limiar or linha.get('razao_memoria', 0) > limiar
+        linhas.append(linha)
+    return pd.DataFrame(linhas)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede tempo e memória de cada etapa do pipeline.")
+    parser.add_argument('--entrada', default=None,
+                        help="CSV no formato do EnronEmails.csv (padrão: gera um sintético com --mensagens).")
+    parser.add_argument('--mensagens', type=int, default=10000,
+                        help="Tamanho do dataset sintético gerado quando --entrada não é informado.")
+    parser.add_argument('--amostras-betweenness', type=int, default=None,
+                        help="Pivôs da betweenness aproximada (padrão: exata).")
+    parser.add_argument('--backend', default='networkx', choices=['networkx', 'esparso'],
+                        help="Implementação do PageRank e do Closeness.")
+    parser.add_argument('--num-egos', type=int, default=3, help="Número de subgrafos renderizados com pyvis.")
+    parser.add_argument('--inicio', default=DATA_INICIO_PADRAO, help="Início do período do filtro de datas.")
+    parser.add_argument('--fim', default=DATA_FIM_PADRAO, help="Fim do período do filtro de datas.")
+    parser.add_argument('--sem-memoria', action='store_true',
+                        help="Mede apenas o tempo, sem o custo adicional do tracemalloc.")
+    parser.add_argument('--saida', default=None,
+                        help="Arquivo JSON de resultado (padrão: dataSets/Outputs/benchmark/benchmark_<data>.json).")
+    parser.add_argument('--comparar', default=None, metavar='JSON',
+                        help="Resultado anterior para comparação etapa a etapa.")
+    args = parser.parse_args()
+
+    caminho_entrada = args.entrada
+    if caminho_entrada is None:
+        caminho_entrada = os.path.join(root_dir, 'dataSets', 'Inputs', f'EnronEmailsSintetico_{args.mensagens}.csv')
+        if not os.path.exists(caminho_entrada):
+            gerar_caixa_postal(caminho_entrada, args.mensagens)
+
+    if not os.path.exists(caminho_entrada):
+        print(f"ERRO: Arquivo não encontrado em '{caminho_entrada}'.")
+        raise SystemExit(1)
+
+    resultado = executar_benchmark(caminho_entrada, args.amostras_betweenness, args.backend, args.num_egos,
+                                   medir_memoria=not args.sem_memoria, inicio=args.inicio, fim=args.fim)
+
+    caminho_saida = args.saida or os.path.join(
+        root_dir, 'dataSets', 'Outputs', 'benchmark', f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(caminho_saida)), exist_ok=True)
+    with open(caminho_saida, 'w') as f:
+        json.dump(resultado, f, indent=4)
+
+    print(f"\nTempo total: {resultado['tempo_total_s']:.2f}s ({resultado['dados']['nos']} nós, {resultado['dados']['arestas']} arestas)")
+    print(f"Resultado salvo em: {caminho_saida}")
+
+    if args.comparar:
+        with open(args.comparar, 'r') as f:
+            anterior = json.load(f)
+        df_comparacao = comparar_resultados(resultado, anterior)
+        print(f"\n--- Comparação com {args.comparar} (versão {anterior.get('versao')}) ---")
+        print(df_comparacao.to_string(index=False))
+        if df_comparacao['regressao'].any():
+            print(f"\nRegressões (> {LIMIAR_REGRESSAO:.0%} do tempo ou memória anterior): {', '.join(df_comparacao.loc[df_comparacao['regressao'], 'etapa'])}")
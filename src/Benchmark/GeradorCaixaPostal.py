@@ -0,0 +1,178 @@
+import numpy as np
+import os
+import csv
+import time
+import argparse
+from datetime import datetime, timezone, timedelta
+
+#Gerador de caixas postais sintéticas no mesmo formato do EnronEmails.csv (colunas 'file' e 'message',
+#com o cabeçalho do e-mail no início de 'message'), para medir o desempenho em escalas controladas.
+#A atividade segue uma lei de potência: poucos endereços enviam e recebem a maior parte das mensagens,
+#e a maioria dos destinatários pertence à mesma comunidade do remetente.
+
+PRIMEIROS_NOMES = [
+    'john', 'mark', 'sara', 'jeff', 'kay', 'tana', 'sally', 'louise', 'vince', 'gerald', 'kenneth', 'greg',
+    'tim', 'david', 'elizabeth', 'susan', 'chris', 'michael', 'richard', 'james', 'robert', 'mary', 'lisa',
+    'karen', 'steven', 'daniel', 'paul', 'kevin', 'brian', 'laura', 'linda', 'scott', 'eric', 'andrew',
+    'jennifer', 'phillip', 'kate', 'matthew', 'stacy', 'debra'
+]
+SOBRENOMES = [
+    'smith', 'jones', 'mann', 'beck', 'kitchen', 'kaminski', 'nemec', 'lay', 'whalley', 'belden', 'delainey',
+    'sager', 'shackleton', 'dasovich', 'skilling', 'lavorato', 'allen', 'taylor', 'williams', 'brown', 'davis',
+    'miller', 'wilson', 'moore', 'anderson', 'thomas', 'jackson', 'white', 'harris', 'martin', 'thompson',
+    'garcia', 'martinez', 'robinson', 'clark', 'lewis', 'lee', 'walker', 'hall', 'young', 'king', 'wright',
+    'scott', 'green', 'baker', 'adams', 'nelson', 'hill', 'campbell', 'mitchell', 'roberts', 'carter',
+    'phillips', 'evans', 'turner', 'torres', 'parker', 'collins', 'edwards', 'stewart'
+]
+DOMINIOS_EXTERNOS = ['aol.com', 'hotmail.com', 'yahoo.com', 'dynegy.com', 'elpaso.com', 'reliant.com', 'pge.com']
+
+#Período principal das mensagens e uma pequena fração de datas fora dele (como no dataset original)
+CENTRO_DATAS = datetime(2001, 6, 1, tzinfo=timezone.utc).timestamp()
+DESVIO_DATAS = 270 * 86400
+LIMITES_DATAS = (datetime(1998, 1, 1, tzinfo=timezone.utc).timestamp(), datetime(2002, 12, 31, tzinfo=timezone.utc).timestamp())
+DATAS_FORA_DO_PERIODO = [datetime(1979, 12, 31, 16, tzinfo=timezone.utc).timestamp(), datetime(2044, 1, 4, tzinfo=timezone.utc).timestamp()]
+
+def gerar_enderecos(num_usuarios, rng):
+    enderecos = []
+    for i in range(num_usuarios):
+        primeiro = PRIMEIROS_NOMES[i % len(PRIMEIROS_NOMES)]
+        sobrenome = SOBRENOMES[(i // len(PRIMEIROS_NOMES)) % len(SOBRENOMES)]
+        sufixo = i // (len(PRIMEIROS_NOMES) * len(SOBRENOMES))
+        nome = f"{primeiro}.{sobrenome}{sufixo if sufixo else ''}"
+        dominio = 'enron.com' if rng.random() < 0.85 else DOMINIOS_EXTERNOS[rng.integers(len(DOMINIOS_EXTERNOS))]
+        enderecos.append(f"{nome}@{dominio}")
+    return np.array(enderecos, dtype=object)
+
+def formatar_data(timestamp):
+    #Formato do cabeçalho Date do dataset: 'Mon, 14 May 2001 16:39:00 -0700 (PDT)'
+    data_utc = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+    horario_verao = 4 <= data_utc.month <= 10
+    fuso = timezone(timedelta(hours=-7 if horario_verao else -8))
+    return data_utc.astimezone(fuso).strftime('%a, %d %b %Y %H:%M:%S %z') + (' (PDT)' if horario_verao else ' (PST)')
+
+def formatar_lista(enderecos):
+    #Listas longas de destinatários são quebradas em várias linhas (cabeçalho dobrado), como no original
+    linhas = [', '.join(enderecos[i:i + 4]) for i in range(0, len(enderecos), 4)]
+    return ',\n\t'.join(linhas)
+
+def montar_mensagem(indice, remetente, destinatarios, copias, data):
+    cabecalho = [
+        f"Message-ID: <{indice}.{1075855378110 + indice}.JavaMail.evans@thyme>",
+        f"Date: {data}",
+        f"From: {remetente}"
+    ]
+    if len(destinatarios):
+        cabecalho.append(f"To: {formatar_lista(destinatarios)}")
+    cabecalho.append(f"Subject: Mensagem {indice}")
+    if len(copias):
+        cabecalho.append(f"Cc: {formatar_lista(copias)}")
+    cabecalho.extend([
+        "Mime-Version: 1.0",
+        "Content-Type: text/plain; charset=us-ascii",
+        "Content-Transfer-Encoding: 7bit"
+    ])
+    if len(copias):
+        cabecalho.append(f"Bcc: {formatar_lista(copias)}")
+    cabecalho.extend([
+        f"X-From: {remetente.split('@')[0]}",
+        "X-To: ",
+        "X-cc: ",
+        "X-bcc: ",
+        "X-Folder: \\Sintetico\\Sent Mail",
+        "X-Origin: Sintetico",
+        "X-FileName: sintetico.nsf"
+    ])
+
+    corpo = f"Texto da mensagem {indice}.\n"
+    if indice % 10 == 0:
+        #Mensagens encaminhadas repetem campos From/To no corpo, que não devem ser extraídos
+        corpo += f"\n -----Original Message-----\nFrom: \t{destinatarios[0] if len(destinatarios) else remetente}\nTo: \t{remetente}\nSent: \t{data}\n\nTexto original.\n"
+
+    return '\n'.join(cabecalho) + '\n\n' + corpo
+
+def gerar_caixa_postal(caminho_saida, num_mensagens, num_usuarios=None, expoente=1.0, seed=42, tamanho_bloco=50000):
+    #num_usuarios: padrão de um endereço para cada 6 mensagens (proporção próxima à do dataset original).
+    #expoente: inclinação da lei de potência da atividade (maior = mais concentrada nos endereços do topo).
+    num_usuarios = num_usuarios or max(100, num_mensagens // 6)
+    rng = np.random.default_rng(seed)
+
+    print(f"Gerando {num_mensagens} mensagens entre {num_usuarios} endereços em: {caminho_saida}")
+    inicio = time.perf_counter()
+
+    enderecos = gerar_enderecos(num_usuarios, rng)
+    pesos = 1.0 / np.arange(1, num_usuarios + 1) ** expoente
+    pesos /= pesos.sum()
+
+    #Comunidades de tamanho variado; a popularidade dentro de cada uma segue os mesmos pesos
+    num_comunidades = max(1, num_usuarios // 50)
+    comunidade = rng.integers(0, num_comunidades, num_usuarios)
+    ordem_comunidade = np.argsort(comunidade, kind='stable')
+    acumulado = np.cumsum(pesos[ordem_comunidade])
+    limites = np.searchsorted(comunidade[ordem_comunidade], np.arange(num_comunidades + 1))
+
+    def sortear_na_comunidade(comunidades):
+        a, b = limites[comunidades], limites[comunidades + 1]
+        base = np.where(a > 0, acumulado[np.maximum(a - 1, 0)], 0.0)
+        total = acumulado[np.maximum(b - 1, 0)] - base
+        posicao = np.searchsorted(acumulado, base + rng.random(len(comunidades)) * total, side='right')
+        return ordem_comunidade[np.clip(posicao, a, np.maximum(b - 1, a))]
+
+    os.makedirs(os.path.dirname(os.path.abspath(caminho_saida)), exist_ok=True)
+    with open(caminho_saida, 'w', encoding='utf-8', newline='') as f:
+        escritor = csv.writer(f)
+        escritor.writerow(['file', 'message'])
+
+        for inicio_bloco in range(0, num_mensagens, tamanho_bloco):
+            n = min(tamanho_bloco, num_mensagens - inicio_bloco)
+
+            remetentes = rng.choice(num_usuarios, size=n, p=pesos)
+            num_destinatarios = np.minimum(rng.geometric(0.35, size=n), 50)
+            difusao = rng.random(n) < 0.01
+            num_destinatarios[difusao] = rng.integers(20, 200, size=difusao.sum())
+            num_destinatarios[rng.random(n) < 0.03] = 0
+            num_copias = np.where(rng.random(n) < 0.2, rng.geometric(0.5, size=n), 0)
+
+            #70% dos destinatários vêm da comunidade do remetente, os demais de toda a rede
+            total = num_destinatarios + num_copias
+            dono = np.repeat(np.arange(n), total)
+            locais = rng.random(len(dono)) < 0.7
+            sorteados = np.empty(len(dono), dtype=np.int64)
+            sorteados[locais] = sortear_na_comunidade(comunidade[remetentes[dono[locais]]])
+            sorteados[~locais] = rng.choice(num_usuarios, size=(~locais).sum(), p=pesos)
+            fim_lista = np.cumsum(total)
+
+            timestamps = np.clip(rng.normal(CENTRO_DATAS, DESVIO_DATAS, size=n), *LIMITES_DATAS)
+            fora = rng.random(n) < 0.001
+            timestamps[fora] = rng.choice(DATAS_FORA_DO_PERIODO, size=fora.sum())
+            timestamps = (timestamps // 60) * 60
+
+            linhas = []
+            for i in range(n):
+                lista = sorteados[fim_lista[i] - total[i]:fim_lista[i]]
+                lista = list(dict.fromkeys(enderecos[lista].tolist()))
+                k = min(num_destinatarios[i], len(lista))
+                indice = inicio_bloco + i
+                mensagem = montar_mensagem(indice, enderecos[remetentes[i]], lista[:k], lista[k:], formatar_data(timestamps[i]))
+                linhas.append([f"sintetico/{enderecos[remetentes[i]].split('@')[0]}/{indice}.", mensagem])
+            escritor.writerows(linhas)
+
+            print(f"  {inicio_bloco + n} mensagens geradas ({time.perf_counter() - inicio:.1f}s)")
+
+    print(f"Caixa postal sintética salva em: {caminho_saida}")
+    return caminho_saida
+
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    root_dir = os.path.abspath(os.path.join(script_dir, '..', '..'))
+
+    parser = argparse.ArgumentParser(description="Gera um CSV sintético no formato do EnronEmails.csv.")
+    parser.add_argument('--mensagens', type=int, default=10000, help="Número de mensagens (ex.: 10000 a 5000000).")
+    parser.add_argument('--usuarios', type=int, default=None, help="Número de endereços (padrão: mensagens / 6).")
+    parser.add_argument('--expoente', type=float, default=1.0, help="Expoente da lei de potência da atividade.")
+    parser.add_argument('--seed', type=int, default=42, help="Semente do gerador aleatório.")
+    parser.add_argument('--saida', default=None,
+                        help="Arquivo de saída (padrão: dataSets/Inputs/EnronEmailsSintetico_<mensagens>.csv).")
+    args = parser.parse_args()
+
+    caminho_saida = args.saida or os.path.join(root_dir, 'dataSets', 'Inputs', f'EnronEmailsSintetico_{args.mensagens}.csv')
+    gerar_caixa_postal(caminho_saida, args.mensagens, args.usuarios, args.expoente, args.seed)
@@ -0,0 +1,193 @@
+import numpy as np
+import pandas as pd
+import os
+import json
+import hashlib
+
+#Armazenamento binário das arestas tratadas, lido pelos módulos de análise
+#sem precisar reinterpretar o CSV textual:
+#  enderecos.json -> lista de endereços (o id de cada endereço é sua posição na lista)
+#  origem.npy     -> int32, id do remetente de cada interação
+#  destino.npy    -> int32, id do destinatário de cada interação
+#  timestamp.npy  -> int64, data da interação em segundos desde 1970-01-01 (UTC)
+#Arestas agregadas (um registro por par remetente -> destinatário, na ordem de primeira aparição):
+#  agregado_origem.npy, agregado_destino.npy -> int32
+#  agregado_contagem.npy                      -> int64, número de interações do par
+#  agregado_primeiro.npy, agregado_ultimo.npy -> int64, primeira e última interação (segundos UTC)
+#Controle da ingestão incremental:
+#  mensagens.npy  -> uint64, chaves ordenadas (Message-ID ou conteúdo) das mensagens já ingeridas
+#  ingestoes.json -> histórico dos arquivos brutos ingeridos, com o tamanho do CSV tratado e o número de
+#                    interações armazenadas ao fim de cada ingestão (usados para detectar saídas dessincronizadas)
+NOME_DIRETORIO_ARMAZENAMENTO = 'ArestasBinarias'
+
+def caminho_armazenamento(caminho_saida_dir):
+    return os.path.join(caminho_saida_dir, NOME_DIRETORIO_ARMAZENAMENTO)
+
+def codificar_interacoes(df_final, indice_enderecos):
+    #Converte remetente/destinatário em ids inteiros, acrescentando endereços novos ao índice
+    #na ordem de primeira aparição (remetente e destinatário de cada linha, em sequência).
+    n = len(df_final)
+    intercalados = np.empty(2 * n, dtype=object)
+    intercalados[0::2] = df_final['remetente'].to_numpy()
+    intercalados[1::2] = df_final['destinatario'].to_numpy()
+
+    codigos, unicos = pd.factorize(intercalados)
+    ids_unicos = np.fromiter(
+        (indice_enderecos.setdefault(endereco, len(indice_enderecos)) for endereco in unicos),
+        dtype=np.int32,
+        count=len(unicos)
+    )
+    ids = ids_unicos[codigos]
+
+    timestamps = df_final['data'].dt.as_unit('s').astype('int64').to_numpy()
+
+    return ids[0::2], ids[1::2], timestamps
+
+def agregar_interacoes(origem, destino, timestamp):
+    #Agregação vetorizada das interações repetidas de cada par (groupby sem reordenar os pares)
+    df = pd.DataFrame({'origem': origem, 'destino': destino, 'timestamp': timestamp})
+    return (
+        df.groupby(['origem', 'destino'], sort=False)['timestamp']
+        .agg(contagem='size', primeiro='min', ultimo='max')
+        .reset_index()
+    )
+
+def mesclar_agregados(df_agregado_antigo, df_agregado_novo):
+    #Os pares já existentes mantêm sua posição e os novos entram no fim, na mesma ordem que
+    #teriam se todas as interações fossem agregadas de uma só vez.
+    df = pd.concat([df_agregado_antigo, df_agregado_novo], ignore_index=True)
+    return (
+        df.groupby(['origem', 'destino'], sort=False)
+        .agg(contagem=('contagem', 'sum'), primeiro=('primeiro', 'min'), ultimo=('ultimo', 'max'))
+        .reset_index()
+    )
+
+def salvar_armazenamento(caminho_saida_dir, indice_enderecos, origem, destino, timestamp, chaves_mensagens=None, df_agregado=None):
+    #chaves_mensagens: chaves das mensagens ingeridas (ver PreProcessamento.chaves_mensagens).
+    #df_agregado: arestas já agregadas; se omitido, é calculado a partir das interações.
+    diretorio = caminho_armazenamento(caminho_saida_dir)
+    os.makedirs(diretorio, exist_ok=True)
+
+    with open(os.path.join(diretorio, 'enderecos.json'), 'w', encoding='utf-8') as f:
+        json.dump(list(indice_enderecos), f)
+
+    np.save(os.path.join(diretorio, 'origem.npy'), np.asarray(origem, dtype=np.int32))
+    np.save(os.path.join(diretorio, 'destino.npy'), np.asarray(destino, dtype=np.int32))
+    np.save(os.path.join(diretorio, 'timestamp.npy'), np.asarray(timestamp, dtype=np.int64))
+
+    if chaves_mensagens is not None:
+        np.save(os.path.join(diretorio, 'mensagens.npy'), np.unique(np.asarray(chaves_mensagens, dtype=np.uint64)))
+
+    if df_agregado is None:
+        df_agregado = agregar_interacoes(origem, destino, timestamp)
+    np.save(os.path.join(diretorio, 'agregado_origem.npy'), df_agregado['origem'].to_numpy(dtype=np.int32))
+    np.save(os.path.join(diretorio, 'agregado_destino.npy'), df_agregado['destino'].to_numpy(dtype=np.int32))
+    np.save(os.path.join(diretorio, 'agregado_contagem.npy'), df_agregado['contagem'].to_numpy(dtype=np.int64))
+    np.save(os.path.join(diretorio, 'agregado_primeiro.npy'), df_agregado['primeiro'].to_numpy(dtype=np.int64))
+    np.save(os.path.join(diretorio, 'agregado_ultimo.npy'), df_agregado['ultimo'].to_numpy(dtype=np.int64))
+
+    return diretorio, df_agregado
+
+def carregar_armazenamento(caminho_saida_dir):
+    #Carrega o armazenamento inteiro em memória (sem mmap, pois os arquivos serão regravados) para
+    #receber novas interações. Retorna (índice de endereços, origem, destino, timestamp, chaves, agregado).
+    diretorio = caminho_armazenamento(caminho_saida_dir)
+
+    with open(os.path.join(diretorio, 'enderecos.json'), 'r', encoding='utf-8') as f:
+        indice_enderecos = {endereco: i for i, endereco in enumerate(json.load(f))}
+
+    origem = np.load(os.path.join(diretorio, 'origem.npy'))
+    destino = np.load(os.path.join(diretorio, 'destino.npy'))
+    timestamp = np.load(os.path.join(diretorio, 'timestamp.npy'))
+
+    caminho_mensagens = os.path.join(diretorio, 'mensagens.npy')
+    chaves = np.load(caminho_mensagens) if os.path.exists(caminho_mensagens) else np.empty(0, dtype=np.uint64)
+
+    df_agregado = pd.DataFrame({
+        coluna: np.load(os.path.join(diretorio, f'agregado_{coluna}.npy'))
+        for coluna in ['origem', 'destino', 'contagem', 'primeiro', 'ultimo']
+    })
+
+    return indice_enderecos, origem, destino, timestamp, chaves, df_agregado
+
+def anexar_armazenamento(caminho_saida_dir, armazenamento, origem, destino, timestamp, chaves_mensagens):
+    #armazenamento: retorno de carregar_armazenamento, com o índice de endereços já estendido pelos
+    #endereços novos. Apenas as interações novas são agregadas; o resultado é mesclado ao agregado existente.
+    indice_enderecos, origem_antiga, destino_antigo, timestamp_antigo, chaves_antigas, df_agregado_antigo = armazenamento
+
+    df_agregado = mesclar_agregados(df_agregado_antigo, agregar_interacoes(origem, destino, timestamp))
+
+    return salvar_armazenamento(
+        caminho_saida_dir,
+        indice_enderecos,
+        np.concatenate([origem_antiga, np.asarray(origem, dtype=np.int32)]),
+        np.concatenate([destino_antigo, np.asarray(destino, dtype=np.int32)]),
+        np.concatenate([timestamp_antigo, np.asarray(timestamp, dtype=np.int64)]),
+        np.concatenate([chaves_antigas, np.asarray(chaves_mensagens, dtype=np.uint64)]),
+        df_agregado
+    )
+
+def hash_arquivo(caminho):
+    #sha256 do conteúdo: identifica um arquivo bruto já ingerido independentemente do nome
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+def carregar_ingestoes(diretorio):
+    try:
+        with open(os.path.join(diretorio, 'ingestoes.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+def estado_saidas(diretorio, caminho_tratado):
+    #Tamanho do CSV tratado e número de interações do armazenamento binário no momento atual
+    return {
+        'tamanho_csv_bytes': os.path.getsize(caminho_tratado),
+        'interacoes_armazenadas': int(np.load(os.path.join(diretorio, 'origem.npy'), mmap_mode='r').shape[0])
+    }
+
+def saidas_sincronizadas(diretorio, caminho_tratado, ingestoes):
+    #Compara o estado atual com o registrado ao fim da última ingestão: uma divergência indica que uma
+    #ingestão anterior foi interrompida entre a gravação do armazenamento e a do CSV tratado.
+    #Históricos gravados antes deste controle não têm o estado e são aceitos.
+    if not ingestoes or 'tamanho_csv_bytes' not in ingestoes[-1]:
+        return True
+    estado = estado_saidas(diretorio, caminho_tratado)
+    return all(ingestoes[-1][campo] == valor for campo, valor in estado.items())
+
+def registrar_ingestao(diretorio, caminho_entrada, caminho_tratado, num_mensagens, num_mensagens_validas, num_interacoes, nova=False, num_duplicadas=0,
+                       periodo=None, hash_conteudo=None):
+    #Deve ser chamada depois que o armazenamento e o CSV tratado (caminho_tratado) foram gravados.
+    #nova=True reinicia o histórico (processamento completo do corpus)
+    #periodo: (início, fim) do filtro de datas, reutilizado pelas ingestões incrementais do mesmo caso
+    #hash_conteudo: sha256 do arquivo bruto (calculado aqui se omitido)
+    ingestoes = [] if nova else carregar_ingestoes(diretorio)
+    ingestoes.append({
+        'arquivo': os.path.basename(caminho_entrada),
+        'tamanho_bytes': os.path.getsize(caminho_entrada),
+        'sha256': hash_conteudo or hash_arquivo(caminho_entrada),
+        'modo': 'completo' if nova else 'incremental',
+        'data_ingestao': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'mensagens_lidas': num_mensagens,
+        'mensagens_ingeridas': num_mensagens_validas,
+        'mensagens_duplicadas': num_duplicadas,
+        'interacoes': num_interacoes,
+        'periodo': list(periodo) if periodo else None,
+        **estado_saidas(diretorio, caminho_tratado)
+    })
+    with open(os.path.join(diretorio, 'ingestoes.json'), 'w', encoding='utf-8') as f:
+        json.dump(ingestoes, f, indent=4)
+
+def salvar_csv_agregado(caminho_arquivo, indice_enderecos, df_agregado):
+    #Versão legível das arestas agregadas: remetente, destinatario, contagem, primeiro_envio, ultimo_envio
+    enderecos = np.array(list(indice_enderecos), dtype=object)
+    pd.DataFrame({
+        'remetente': enderecos[df_agregado['origem'].to_numpy()],
+        'destinatario': enderecos[df_agregado['destino'].to_numpy()],
+        'contagem': df_agregado['contagem'].to_numpy(),
+        'primeiro_envio': pd.to_datetime(df_agregado['primeiro'].to_numpy(), unit='s', utc=True),
+        'ultimo_envio': pd.to_datetime(df_agregado['ultimo'].to_numpy(), unit='s', utc=True)
+    }).to_csv(caminho_arquivo, index=False)
@@ -1,8 +1,285 @@
 import pandas as pd
 import re
 import os
+import json
+import argparse
+import time
+import shutil
+import tempfile
+import email.utils
+from functools import lru_cache
+from collections import deque
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from ArmazenamentoArestas import (codificar_interacoes, salvar_armazenamento, salvar_csv_agregado,
+                                  carregar_armazenamento, anexar_armazenamento, carregar_ingestoes, registrar_ingestao,
+                                  hash_arquivo, saidas_sincronizadas)
 
-def processar_dados():    
+#Cabeçalhos extraídos de cada mensagem (nome no e-mail -> coluna do DataFrame)
+CAMPOS_CABECALHO = {
+    'From': 'remetente',
+    'To': 'destinatario_raw',
+    'Date': 'data_raw',
+    'Message-ID': 'id_mensagem',
+    'Cc': 'copia_raw',
+    'Bcc': 'copia_oculta_raw'
+}
+
+#Tipos de destinatário (valor da coluna tipo_destinatario -> coluna com a lista bruta).
+#Um endereço presente em mais de um campo da mesma mensagem conta uma única vez, no primeiro tipo.
+TIPOS_DESTINATARIO = {
+    'to': 'destinatario_raw',
+    'cc': 'copia_raw',
+    'bcc': 'copia_oculta_raw'
+}
+
+#Cada campo inclui as linhas de continuação (cabeçalho dobrado: linhas seguintes iniciadas por espaço ou tab)
+PADRAO_CABECALHO = re.compile(r"^(From|To|Cc|Bcc|Date|Message-ID):[ \t]*(.*(?:\r?\n[ \t].*)*)", re.MULTILINE)
+PADRAO_DOBRA = re.compile(r"\r?\n(?=[ \t])")
+
+#Nomes de exibição entre aspas (podem conter vírgulas) e endereço entre < >
+PADRAO_NOME_EXIBICAO = r'"[^"]*"'
+PADRAO_ENDERECO_ENTRE_SINAIS = r'<([^<>]*)>'
+
+#Layout RFC-2822 usado pela grande maioria dos cabeçalhos Date ('Mon, 14 May 2001 16:39:00 -0700 (PDT)'),
+#convertido com formato explícito depois de remover o comentário final com o nome do fuso
+FORMATO_DATA = '%a, %d %b %Y %H:%M:%S %z'
+PADRAO_COMENTARIO_DATA = r'\s*\([^)]*\)\s*$'
+
+#Período principal das mensagens do caso; datas fora dele (ex.: 1979, 2044) são descartadas
+DATA_INICIO_PADRAO = '1985-01-01'
+DATA_FIM_PADRAO = '2003-12-31'
+
+TAMANHO_CHUNK_PADRAO = 20000
+
+def extrair_cabecalhos(texto_mensagem):
+    #Varre apenas o bloco de cabeçalho (até a primeira linha em branco) uma única vez,
+    #retornando a primeira ocorrência de cada campo já desdobrada em uma linha.
+    fim_cabecalho = texto_mensagem.find("\n\n")
+    if fim_cabecalho != -1:
+        texto_mensagem = texto_mensagem[:fim_cabecalho]
+
+    campos = {}
+    for match in PADRAO_CABECALHO.finditer(texto_mensagem):
+        campo = match.group(1)
+        if campo not in campos:
+            valor = match.group(2)
+            if "\n" in valor:
+                valor = PADRAO_DOBRA.sub("", valor)
+            campos[campo] = valor.strip()
+            if len(campos) == len(CAMPOS_CABECALHO):
+                break
+
+    return tuple(campos.get(campo) for campo in CAMPOS_CABECALHO)
+
+def chaves_mensagens(ids_mensagem, mensagens):
+    #Identificador de 64 bits de cada mensagem, usado para não ingerir a mesma mensagem duas vezes:
+    #hash do Message-ID ou, na falta dele, do conteúdo completo da mensagem.
+    referencias = ('id:' + ids_mensagem).fillna('conteudo:' + mensagens)
+    return pd.util.hash_pandas_object(referencias, index=False).to_numpy()
+
+@lru_cache(maxsize=100000)
+def converter_data_avulsa(texto_data):
+    #Conversão individual das variantes fora do layout padrão (sem dia da semana, ano com 2 dígitos,
+    #fuso por nome como 'EDT'...). Variantes se repetem muito, por isso o resultado fica em cache.
+    try:
+        data = email.utils.parsedate_to_datetime(texto_data)
+        return pd.Timestamp(data).tz_localize('UTC') if data.tzinfo is None else pd.Timestamp(data).tz_convert('UTC')
+    except (TypeError, ValueError, IndexError, OverflowError):
+        pass
+    try:
+        return pd.to_datetime(texto_data, utc=True)
+    except (ValueError, OverflowError):
+        return pd.NaT
+
+def converter_datas(datas_raw, auditoria=None):
+    #Conversão vetorizada com formato explícito; apenas os textos que não seguem o layout
+    #padrão passam pela conversão individual (uma vez por texto distinto).
+    textos = datas_raw.str.replace(PADRAO_COMENTARIO_DATA, '', regex=True)
+    datas = pd.to_datetime(textos, format=FORMATO_DATA, errors='coerce', utc=True)
+
+    pendentes = datas.isna() & textos.notna()
+    if pendentes.any():
+        datas[pendentes] = pd.to_datetime(textos[pendentes].map(converter_data_avulsa), utc=True)
+
+    if auditoria is not None:
+        auditoria['datas_ausentes'] += int(datas_raw.isna().sum())
+        auditoria['datas_formato_alternativo'] += int((pendentes & datas.notna()).sum())
+        auditoria['datas_invalidas'] += int((pendentes & datas.isna()).sum())
+    return datas
+
+def extrair_campos(df, auditoria=None):
+    #Extração dos Campos do E-mail
+    cabecalhos = [extrair_cabecalhos(msg) for msg in df['message']]
+    mensagens = df['message']
+    df = pd.DataFrame(cabecalhos, columns=list(CAMPOS_CABECALHO.values()), index=df.index)
+    df['chave_mensagem'] = chaves_mensagens(df['id_mensagem'], mensagens)
+
+    #Limpeza e Padronização dos Dados
+    df['data'] = converter_datas(df['data_raw'], auditoria)
+    df = df.dropna(subset=['remetente', 'data'])
+    return df[df[list(TIPOS_DESTINATARIO.values())].notna().any(axis=1)].copy()
+
+def carregar_apelidos(caminho_apelidos):
+    #Mapa de apelidos em JSON ({"klay@enron.com": "kenneth.lay@enron.com", ...}), com chaves e valores canônicos
+    if not caminho_apelidos:
+        return {}
+    with open(caminho_apelidos, 'r', encoding='utf-8') as f:
+        apelidos = json.load(f)
+    return {alias.strip().lower(): endereco.strip().lower() for alias, endereco in apelidos.items()}
+
+def nova_auditoria():
+    return {
+        'destinatarios_brutos': 0,
+        'nomes_exibicao_removidos': 0,
+        'vazios_descartados': 0,
+        'invalidos_descartados': 0,
+        'repetidos_na_mensagem': 0,
+        'remetentes_invalidos': 0,
+        'apelidos_mesclados': 0,
+        'interacoes_to': 0,
+        'interacoes_cc': 0,
+        'interacoes_bcc': 0,
+        'datas_ausentes': 0,
+        'datas_formato_alternativo': 0,
+        'datas_invalidas': 0,
+        'mensagens_fora_do_periodo': 0
+    }
+
+def somar_auditoria(total, parcial):
+    for chave, valor in parcial.items():
+        total[chave] = total.get(chave, 0) + valor
+    return total
+
+def canonizar_enderecos(valores, apelidos, auditoria):
+    #Operações vetorizadas sobre a Series de entradas: remove o nome de exibição (fica o endereço
+    #entre < >), aspas e espaços, converte para minúsculas e aplica o mapa de apelidos.
+    #Entradas sem '@' viram NaN.
+    valores = valores.str.strip()
+    entre_sinais = valores.str.extract(PADRAO_ENDERECO_ENTRE_SINAIS, expand=False)
+    auditoria['nomes_exibicao_removidos'] += int(entre_sinais.notna().sum())
+
+    valores = entre_sinais.fillna(valores).str.strip(" \t'\"").str.lower()
+    if apelidos:
+        mapeados = valores.map(apelidos)
+        auditoria['apelidos_mesclados'] += int(mapeados.notna().sum())
+        valores = mapeados.fillna(valores)
+
+    return valores.where(valores.str.contains('@', regex=False, na=False))
+
+def normalizar_destinatarios(df_limpo, apelidos=None, tipos=tuple(TIPOS_DESTINATARIO), auditoria=None):
+    #Normalização da Tabela: uma linha por par remetente -> destinatário, com o tipo (to/cc/bcc).
+    #Apenas as listas de destinatários são expandidas; remetente e data são copiados no fim por posição.
+    #apelidos: mapa endereço -> endereço canônico (ver carregar_apelidos).
+    #auditoria: dicionário (ver nova_auditoria) que acumula as contagens de endereços descartados/mesclados.
+    apelidos = apelidos or {}
+    auditoria = auditoria if auditoria is not None else nova_auditoria()
+
+    remetentes = canonizar_enderecos(df_limpo['remetente'], apelidos, auditoria).to_numpy()
+    auditoria['remetentes_invalidos'] += int(pd.isna(remetentes).sum())
+
+    colunas = [TIPOS_DESTINATARIO[tipo] for tipo in tipos]
+    listas = df_limpo[colunas].set_axis(list(tipos), axis=1)
+    listas.index = np.arange(len(df_limpo))
+    listas = listas.stack().dropna()
+
+    entradas = listas.str.replace(PADRAO_NOME_EXIBICAO, '', regex=True).str.split(',').explode()
+    auditoria['destinatarios_brutos'] += len(entradas)
+
+    destinatarios = canonizar_enderecos(entradas, apelidos, auditoria)
+    vazios = entradas.str.strip().fillna('') == ''
+    auditoria['vazios_descartados'] += int(vazios.sum())
+    auditoria['invalidos_descartados'] += int((destinatarios.isna() & ~vazios).sum())
+
+    posicoes = destinatarios.index.get_level_values(0).to_numpy()
+    df_pares = pd.DataFrame({
+        'posicao': posicoes,
+        'destinatario': destinatarios.to_numpy(),
+        'tipo_destinatario': destinatarios.index.get_level_values(1).to_numpy()
+    })
+    df_pares = df_pares[df_pares['destinatario'].notna() & pd.notna(remetentes[posicoes])]
+
+    repetidos = df_pares.duplicated(subset=['posicao', 'destinatario'])
+    auditoria['repetidos_na_mensagem'] += int(repetidos.sum())
+    df_pares = df_pares[~repetidos]
+
+    df_final = pd.DataFrame({
+        'remetente': remetentes[df_pares['posicao'].to_numpy()],
+        'destinatario': df_pares['destinatario'].to_numpy(),
+        'data': df_limpo['data'].iloc[df_pares['posicao'].to_numpy()].reset_index(drop=True),
+        'tipo_destinatario': df_pares['tipo_destinatario'].to_numpy()
+    })
+    for tipo, contagem in df_final['tipo_destinatario'].value_counts().items():
+        auditoria[f'interacoes_{tipo}'] += int(contagem)
+
+    return df_final
+
+def filtrar_periodo(df, start_date, end_date, auditoria=None):
+    #Aplicado às mensagens, antes da expansão dos destinatários; período [start_date, end_date)
+    no_periodo = (df['data'] >= start_date) & (df['data'] < end_date)
+    if auditoria is not None:
+        auditoria['mensagens_fora_do_periodo'] += int((~no_periodo).sum())
+    return df[no_periodo]
+
+def tratar_mensagens(df, start_date, end_date, apelidos=None, tipos=tuple(TIPOS_DESTINATARIO), auditoria=None):
+    df_limpo = filtrar_periodo(extrair_campos(df, auditoria), start_date, end_date, auditoria)
+    return normalizar_destinatarios(df_limpo, apelidos, tipos, auditoria)
+
+def converter_periodo(inicio, fim):
+    #O dia de fim é incluído por inteiro: o limite exclusivo é a meia-noite do dia seguinte
+    return pd.to_datetime(inicio, utc=True), pd.to_datetime(fim, utc=True).normalize() + pd.Timedelta(days=1)
+
+def salvar_auditoria(caminho_saida_dir, auditoria, acumular=False):
+    #Contagens de datas e endereços descartados/mesclados no pré-processamento; com acumular=True
+    #(ingestão incremental) as contagens são somadas às já registradas.
+    caminho_auditoria = os.path.join(caminho_saida_dir, 'auditoria_preprocessamento.json')
+    if acumular:
+        try:
+            with open(caminho_auditoria, 'r') as f:
+                auditoria = somar_auditoria(json.load(f), auditoria)
+        except FileNotFoundError:
+            pass
+
+    with open(caminho_auditoria, 'w') as f:
+        json.dump(auditoria, f, indent=4)
+
+    print(f"Auditoria dos endereços: {auditoria['destinatarios_brutos']} destinatários brutos, "
+          f"{auditoria['nomes_exibicao_removidos']} nomes de exibição removidos, "
+          f"{auditoria['vazios_descartados'] + auditoria['invalidos_descartados']} descartados (vazios ou sem '@'), "
+          f"{auditoria['repetidos_na_mensagem']} repetidos na mesma mensagem, "
+          f"{auditoria['apelidos_mesclados']} apelidos mesclados, "
+          f"{auditoria['remetentes_invalidos']} remetentes inválidos.")
+    print(f"Auditoria das datas: {auditoria['datas_ausentes']} mensagens sem Date, "
+          f"{auditoria['datas_invalidas']} datas não reconhecidas, "
+          f"{auditoria['datas_formato_alternativo']} em formato alternativo, "
+          f"{auditoria['mensagens_fora_do_periodo']} mensagens fora do período.")
+    print(f"Interações por tipo: to={auditoria['interacoes_to']}, "
+          f"cc={auditoria['interacoes_cc']}, bcc={auditoria['interacoes_bcc']}. Detalhes em: {caminho_auditoria}")
+
+def processar_bloco(chunk, start_date, end_date, cabecalho, apelidos=None, tipos=tuple(TIPOS_DESTINATARIO), chaves_vistas=None):
+    #Processa um shard do CSV bruto e devolve as interações limpas junto com sua versão
+    #já serializada em CSV, para que a formatação também ocorra no processo trabalhador.
+    #Mensagens repetidas no bloco ou presentes em chaves_vistas (blocos anteriores) são descartadas.
+    auditoria = nova_auditoria()
+    df_limpo = extrair_campos(chunk, auditoria)
+    chaves = df_limpo['chave_mensagem'].to_numpy()
+    repetidas = mensagens_repetidas(chaves, np.empty(0, dtype=np.uint64), chaves_vistas or set())
+    df_limpo = df_limpo[~repetidas]
+    chaves = chaves[~repetidas]
+
+    df_limpo = filtrar_periodo(df_limpo, start_date, end_date, auditoria)
+    df_final = normalizar_destinatarios(df_limpo, apelidos, tipos, auditoria)
+
+    return len(chunk), df_final, df_final.to_csv(index=False, header=cabecalho), chaves, int(repetidas.sum()), auditoria
+
+def possui_ingestoes_incrementais(caminho_saida_dir):
+    ingestoes = carregar_ingestoes(os.path.join(caminho_saida_dir, 'ArestasBinarias'))
+    return any(registro.get('modo') == 'incremental' for registro in ingestoes)
+
+def processar_dados(streaming=False, tamanho_chunk=TAMANHO_CHUNK_PADRAO, workers=1, apelidos=None, tipos=tuple(TIPOS_DESTINATARIO),
+                    inicio=DATA_INICIO_PADRAO, fim=DATA_FIM_PADRAO, sobrescrever=False):
+    #sobrescrever: reprocessa EnronEmails.csv mesmo que as saídas contenham caixas postais anexadas
+    #com --anexar (que seriam descartadas, pois não fazem parte do arquivo de entrada)
     #Definição dos Caminhos
     script_dir = os.path.dirname(os.path.abspath(__file__))
     root_dir = os.path.abspath(os.path.join(script_dir, '..', '..'))
@@ -10,8 +287,19 @@ def processar_dados():
     caminho_saida_dir = os.path.join(root_dir, 'dataSets', 'Outputs')
     caminho_saida_arquivo = os.path.join(caminho_saida_dir, 'EnronEmailsTratados.csv')
 
+    if not sobrescrever and possui_ingestoes_incrementais(caminho_saida_dir):
+        print(f"ERRO: As saídas em '{caminho_saida_dir}' contêm caixas postais anexadas com --anexar, que seriam perdidas.")
+        print("Use --sobrescrever para reprocessar apenas 'EnronEmails.csv' mesmo assim.")
+        return
+
+    if streaming or workers > 1:
+        processar_dados_streaming(caminho_entrada, caminho_saida_arquivo, inicio, fim, tamanho_chunk, workers,
+                                  apelidos=apelidos, tipos=tipos)
+        return
+
+    start_date, end_date = converter_periodo(inicio, fim)
     print(f"Carregando dataset de: {caminho_entrada}")
-    
+
     #Carregamento dos Dados
     try:
         df = pd.read_csv(caminho_entrada)
@@ -19,55 +307,360 @@ def processar_dados():
         print(f"ERRO: Arquivo não encontrado em '{caminho_entrada}'.")
         return
 
-    #Extração dos Campos do E-mail
-    def extrair_campo(texto_mensagem, campo):
-        padrao = re.search(f"^{campo}: (.*)", texto_mensagem, re.MULTILINE)
-        if padrao:
-            return padrao.group(1).strip()
-        return None
+    print(f"Extraindo campos 'From', 'Date' e destinatários ({', '.join(tipos)}), limpando e normalizando a tabela de interações...")
+    auditoria = nova_auditoria()
+    df_limpo = extrair_campos(df, auditoria)
+    chaves = df_limpo['chave_mensagem'].to_numpy()
 
-    print("Extraindo campos 'From', 'To' e 'Date'...")
-    df['remetente'] = df['message'].apply(lambda msg: extrair_campo(msg, 'From'))
-    df['destinatario_raw'] = df['message'].apply(lambda msg: extrair_campo(msg, 'To'))
-    df['data_raw'] = df['message'].apply(lambda msg: extrair_campo(msg, 'Date'))
+    #Mensagens repetidas no corpus (mesmo Message-ID ou conteúdo) entram uma única vez, como no --anexar
+    repetidas = mensagens_repetidas(chaves, np.empty(0, dtype=np.uint64), set())
+    df_limpo = df_limpo[~repetidas]
+    chaves = chaves[~repetidas]
+    print(f"Mensagens repetidas descartadas: {int(repetidas.sum())}.")
 
-    #Limpeza e Padronização dos Dados
-    print("Limpando e padronizando os dados...")
-    
-    df['data'] = pd.to_datetime(df['data_raw'], errors='coerce', utc=True)
-    df_limpo = df.dropna(subset=['remetente', 'destinatario_raw', 'data'])
-    df_limpo['destinatarios_lista'] = df_limpo['destinatario_raw'].str.split(',')
-
-    #Normalização da Tabela (Explode)
-    print("Normalizando a tabela de interações...")
-    
-    df_final = df_limpo.explode('destinatarios_lista')
-    df_final = df_final.rename(columns={'destinatarios_lista': 'destinatario'})
-    df_final['remetente'] = df_final['remetente'].str.strip().str.lower()
-    df_final['destinatario'] = df_final['destinatario'].str.strip().str.lower()
-    df_final = df_final[['remetente', 'destinatario', 'data']]
-    df_final.dropna(inplace=True)
-    df_final = df_final[df_final['destinatario'] != '']
-    
-    #Filtro de Datas Inválidas
-    print(f"Dados brutos: {len(df_final)} interações.")
-    
-    start_date = pd.to_datetime('1985-01-01', utc=True)
-    end_date = pd.to_datetime('2003-12-31', utc=True)
-    
-    print(f"Filtrando datas para o período principal: {start_date.year} a {end_date.year}")
-    
-    df_final = df_final[(df_final['data'] >= start_date) & (df_final['data'] <= end_date)]
-    
-    print(f"Dados limpos (filtrados por data): {len(df_final)} interações.")
+    #Filtro de Datas Inválidas (por mensagem, antes de expandir os destinatários)
+    print(f"Mensagens com remetente, data e destinatário: {len(df_limpo)}.")
+    print(f"Filtrando datas para o período principal: {inicio} a {fim}")
+
+    df_limpo = filtrar_periodo(df_limpo, start_date, end_date, auditoria)
+    df_final = normalizar_destinatarios(df_limpo, apelidos, tipos, auditoria)
+
+    print(f"Dados limpos (filtrados por data): {len(df_limpo)} mensagens, {len(df_final)} interações.")
 
     #Salvando o Resultado
     print(f"Salvando o arquivo processado em: {caminho_saida_arquivo}")
 
     os.makedirs(caminho_saida_dir, exist_ok=True)
     df_final.to_csv(caminho_saida_arquivo, index=False)
-    
+    salvar_auditoria(caminho_saida_dir, auditoria)
+
+    indice_enderecos = {}
+    origem, destino, timestamp = codificar_interacoes(df_final, indice_enderecos)
+    caminho_armazenamento, df_agregado = salvar_armazenamento(caminho_saida_dir, indice_enderecos, origem, destino, timestamp, chaves)
+    registrar_ingestao(caminho_armazenamento, caminho_entrada, caminho_saida_arquivo, len(df), len(chaves), len(df_final), nova=True,
+                       num_duplicadas=int(repetidas.sum()), periodo=(inicio, fim))
+    print(f"Armazenamento binário de arestas salvo em: {caminho_armazenamento}")
+
+    caminho_agregado = os.path.join(caminho_saida_dir, 'EnronEmailsAgregados.csv')
+    salvar_csv_agregado(caminho_agregado, indice_enderecos, df_agregado)
+    print(f"Arestas agregadas ({len(df_agregado)} pares remetente -> destinatário) salvas em: {caminho_agregado}")
+
     print("\n--- Pré-processamento concluído com sucesso!")
 
+def mensagens_repetidas(chaves, chaves_ingeridas, chaves_vistas):
+    #Marca as mensagens já presentes no armazenamento (busca binária nas chaves ordenadas),
+    #as repetidas dentro do próprio bloco e as já vistas em blocos/arquivos anteriores desta ingestão.
+    posicao = np.searchsorted(chaves_ingeridas, chaves)
+    ja_ingeridas = np.zeros(len(chaves), dtype=bool)
+    if len(chaves_ingeridas):
+        ja_ingeridas = chaves_ingeridas[np.minimum(posicao, len(chaves_ingeridas) - 1)] == chaves
+
+    vistas = np.fromiter((chave in chaves_vistas for chave in chaves.tolist()), dtype=bool, count=len(chaves))
+    return ja_ingeridas | vistas | pd.Series(chaves).duplicated().to_numpy()
+
+def processar_dados_incremental(caminhos_entrada, tamanho_chunk=TAMANHO_CHUNK_PADRAO, apelidos=None, tipos=tuple(TIPOS_DESTINATARIO),
+                                inicio=None, fim=None):
+    #Anexa novas caixas postais ao corpus já processado: só os arquivos informados são lidos,
+    #mensagens já ingeridas (mesmo Message-ID ou conteúdo) são descartadas e as interações novas
+    #são acrescentadas ao CSV tratado e mescladas ao armazenamento binário.
+    #inicio/fim: padrão = período usado na última ingestão do caso.
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    root_dir = os.path.abspath(os.path.join(script_dir, '..', '..'))
+    caminho_saida_dir = os.path.join(root_dir, 'dataSets', 'Outputs')
+    caminho_saida_arquivo = os.path.join(caminho_saida_dir, 'EnronEmailsTratados.csv')
+    caminho_agregado = os.path.join(caminho_saida_dir, 'EnronEmailsAgregados.csv')
+
+    try:
+        armazenamento = carregar_armazenamento(caminho_saida_dir)
+    except FileNotFoundError:
+        print(f"ERRO: Armazenamento de arestas não encontrado em '{caminho_saida_dir}'.")
+        print("Execute o pré-processamento completo antes de anexar novas caixas postais.")
+        return
+
+    indice_enderecos, _, _, _, chaves_ingeridas, df_agregado_antigo = armazenamento
+    diretorio = os.path.join(caminho_saida_dir, 'ArestasBinarias')
+    ingestoes = carregar_ingestoes(diretorio)
+    if not os.path.exists(caminho_saida_arquivo) or not saidas_sincronizadas(diretorio, caminho_saida_arquivo, ingestoes):
+        print(f"ERRO: '{caminho_saida_arquivo}' e o armazenamento em '{diretorio}' não correspondem à última ingestão registrada.")
+        print("Uma ingestão anterior foi interrompida. Execute o pré-processamento completo antes de anexar novas caixas postais.")
+        return
+    ja_ingeridos = {registro['sha256'] for registro in ingestoes if 'sha256' in registro}
+    periodo_anterior = (ingestoes[-1].get('periodo') if ingestoes else None) or [DATA_INICIO_PADRAO, DATA_FIM_PADRAO]
+    inicio = inicio or periodo_anterior[0]
+    fim = fim or periodo_anterior[1]
+    start_date, end_date = converter_periodo(inicio, fim)
+    num_enderecos_antes = len(indice_enderecos)
+
+    chaves_vistas = set()
+    auditoria = nova_auditoria()
+    blocos_origem, blocos_destino, blocos_timestamp, blocos_chaves = [], [], [], []
+    resumo_arquivos = []
+
+    #As linhas novas vão para um arquivo temporário e só são acrescentadas ao CSV tratado depois que
+    #o armazenamento binário foi atualizado: uma falha no meio não deixa linhas a mais no CSV, e uma
+    #interrupção entre as duas gravações é detectada pela próxima ingestão (saidas_sincronizadas)
+    descritor, caminho_temp = tempfile.mkstemp(dir=caminho_saida_dir, prefix='anexar_', suffix='.tmp')
+    try:
+        with os.fdopen(descritor, 'w', encoding='utf-8', newline='') as f:
+            for caminho_entrada in caminhos_entrada:
+                #O arquivo é identificado pelo conteúdo: um arquivo renomeado não é ingerido duas vezes e
+                #um arquivo novo com o mesmo nome e tamanho de um anterior não é descartado
+                try:
+                    hash_conteudo = hash_arquivo(caminho_entrada)
+                except FileNotFoundError:
+                    print(f"ERRO: Arquivo não encontrado em '{caminho_entrada}'. Pulando.")
+                    continue
+                if hash_conteudo in ja_ingeridos:
+                    print(f"Arquivo '{caminho_entrada}' já foi ingerido. Pulando.")
+                    continue
+                ja_ingeridos.add(hash_conteudo)
+
+                print(f"Anexando mensagens de: {caminho_entrada}")
+                num_mensagens, num_novas, num_duplicadas, num_interacoes = 0, 0, 0, 0
+
+                for chunk in pd.read_csv(caminho_entrada, chunksize=tamanho_chunk):
+                    #As contagens de datas da auditoria incluem as mensagens já ingeridas deste arquivo
+                    df_limpo = extrair_campos(chunk, auditoria)
+                    chaves = df_limpo['chave_mensagem'].to_numpy()
+                    repetidas = mensagens_repetidas(chaves, chaves_ingeridas, chaves_vistas)
+
+                    df_limpo = df_limpo[~repetidas]
+                    chaves = chaves[~repetidas]
+                    chaves_vistas.update(chaves.tolist())
+
+                    df_limpo = filtrar_periodo(df_limpo, start_date, end_date, auditoria)
+                    df_final = normalizar_destinatarios(df_limpo, apelidos, tipos, auditoria)
+                    f.write(df_final.to_csv(index=False, header=False))
+
+                    origem, destino, timestamp = codificar_interacoes(df_final, indice_enderecos)
+                    blocos_origem.append(origem)
+                    blocos_destino.append(destino)
+                    blocos_timestamp.append(timestamp)
+                    blocos_chaves.append(chaves)
+
+                    num_mensagens += len(chunk)
+                    num_novas += len(chaves)
+                    num_duplicadas += int(repetidas.sum())
+                    num_interacoes += len(df_final)
+
+                print(f"  {num_mensagens} mensagens lidas: {num_novas} novas, {num_duplicadas} já ingeridas, {num_interacoes} interações novas.")
+                resumo_arquivos.append((caminho_entrada, hash_conteudo, num_mensagens, num_novas, num_interacoes, num_duplicadas))
+
+        if not resumo_arquivos:
+            print("Nenhum arquivo novo para anexar.")
+            return
+
+        caminho_armazenamento, df_agregado = anexar_armazenamento(
+            caminho_saida_dir,
+            armazenamento,
+            np.concatenate(blocos_origem),
+            np.concatenate(blocos_destino),
+            np.concatenate(blocos_timestamp),
+            np.concatenate(blocos_chaves)
+        )
+        with open(caminho_temp, 'rb') as origem_temp, open(caminho_saida_arquivo, 'ab') as destino_csv:
+            shutil.copyfileobj(origem_temp, destino_csv)
+        #O armazenamento não pode parecer mais antigo que o CSV (ver CarregadorGrafo.armazenamento_disponivel)
+        os.utime(os.path.join(caminho_armazenamento, 'origem.npy'))
+    finally:
+        os.remove(caminho_temp)
+
+    for caminho_entrada, hash_conteudo, num_mensagens, num_novas, num_interacoes, num_duplicadas in resumo_arquivos:
+        registrar_ingestao(caminho_armazenamento, caminho_entrada, caminho_saida_arquivo, num_mensagens, num_novas, num_interacoes,
+                           num_duplicadas=num_duplicadas, periodo=(inicio, fim), hash_conteudo=hash_conteudo)
+
+    salvar_csv_agregado(caminho_agregado, indice_enderecos, df_agregado)
+    salvar_auditoria(caminho_saida_dir, auditoria, acumular=True)
+
+    print(f"Armazenamento binário de arestas atualizado em: {caminho_armazenamento}")
+    print(f"  {len(indice_enderecos) - num_enderecos_antes} endereços novos e {len(df_agregado) - len(df_agregado_antigo)} pares remetente -> destinatário novos.")
+    print("Execute 'AnaliseEstatica.py --incremental' para atualizar grau e PageRank.")
+    print("\n--- Ingestão incremental concluída com sucesso!")
+
+def iterar_blocos_processados(leitor, start_date, end_date, workers, apelidos=None, tipos=tuple(TIPOS_DESTINATARIO)):
+    #Gera os resultados de cada bloco na mesma ordem do arquivo de entrada.
+    #Com mais de um worker, no máximo 2 * workers blocos ficam em memória ao mesmo tempo.
+    #Uma mensagem já vista em um bloco anterior é descartada, como na execução sem blocos.
+    chaves_vistas = set()
+    if workers <= 1:
+        for i, chunk in enumerate(leitor):
+            resultado = processar_bloco(chunk, start_date, end_date, i == 0, apelidos, tipos, chaves_vistas)
+            chaves_vistas.update(resultado[3].tolist())
+            yield resultado
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pendentes = deque()
+
+        def proximo_resultado():
+            #Os workers não conhecem os blocos anteriores ainda em andamento: se o bloco trouxer uma
+            #mensagem já vista (caso raro), ele é reprocessado aqui descartando as repetidas
+            i, chunk, futuro = pendentes.popleft()
+            resultado = futuro.result()
+            if any(chave in chaves_vistas for chave in resultado[3].tolist()):
+                resultado = processar_bloco(chunk, start_date, end_date, i == 0, apelidos, tipos, chaves_vistas)
+            chaves_vistas.update(resultado[3].tolist())
+            return resultado
+
+        for i, chunk in enumerate(leitor):
+            pendentes.append((i, chunk, executor.submit(processar_bloco, chunk, start_date, end_date, i == 0, apelidos, tipos)))
+            if len(pendentes) >= 2 * workers:
+                yield proximo_resultado()
+
+        while pendentes:
+            yield proximo_resultado()
+
+def processar_dados_streaming(caminho_entrada, caminho_saida_arquivo, inicio, fim, tamanho_chunk, workers=1, verbose=True, gravar_armazenamento=True,
+                              apelidos=None, tipos=tuple(TIPOS_DESTINATARIO)):
+    #Lê o CSV bruto em blocos de tamanho fixo e anexa as arestas limpas ao arquivo de saída,
+    #mantendo o uso de memória limitado ao tamanho de um bloco (por worker).
+    if verbose:
+        print(f"Carregando dataset em blocos de {tamanho_chunk} mensagens ({workers} worker(s)) de: {caminho_entrada}")
+
+    try:
+        leitor = pd.read_csv(caminho_entrada, chunksize=tamanho_chunk)
+    except FileNotFoundError:
+        print(f"ERRO: Arquivo não encontrado em '{caminho_entrada}'.")
+        return None
+
+    os.makedirs(os.path.dirname(caminho_saida_arquivo), exist_ok=True)
+    start_date, end_date = converter_periodo(inicio, fim)
+
+    total_mensagens = 0
+    total_limpo = 0
+    total_repetidas = 0
+    auditoria = nova_auditoria()
+
+    #Os ids inteiros de cada bloco ocupam bem menos memória que as strings originais
+    indice_enderecos = {}
+    blocos_origem, blocos_destino, blocos_timestamp, blocos_chaves = [], [], [], []
+
+    with open(caminho_saida_arquivo, 'w', encoding='utf-8', newline='') as f:
+        blocos = iterar_blocos_processados(leitor, start_date, end_date, workers, apelidos, tipos)
+        for i, (n_mensagens, df_final, texto_csv, chaves, n_repetidas, auditoria_bloco) in enumerate(blocos):
+            f.write(texto_csv)
+            somar_auditoria(auditoria, auditoria_bloco)
+
+            if gravar_armazenamento:
+                origem, destino, timestamp = codificar_interacoes(df_final, indice_enderecos)
+                blocos_origem.append(origem)
+                blocos_destino.append(destino)
+                blocos_timestamp.append(timestamp)
+                blocos_chaves.append(chaves)
+
+            total_mensagens += n_mensagens
+            total_limpo += len(df_final)
+            total_repetidas += n_repetidas
+
+            if verbose:
+                print(f"  Bloco {i + 1}: {total_mensagens} mensagens lidas, {total_limpo} interações gravadas.")
+
+    if gravar_armazenamento:
+        caminho_armazenamento, df_agregado = salvar_armazenamento(
+            os.path.dirname(caminho_saida_arquivo),
+            indice_enderecos,
+            np.concatenate(blocos_origem) if blocos_origem else np.empty(0, dtype=np.int32),
+            np.concatenate(blocos_destino) if blocos_destino else np.empty(0, dtype=np.int32),
+            np.concatenate(blocos_timestamp) if blocos_timestamp else np.empty(0, dtype=np.int64),
+            np.concatenate(blocos_chaves) if blocos_chaves else np.empty(0, dtype=np.uint64)
+        )
+        registrar_ingestao(caminho_armazenamento, caminho_entrada, caminho_saida_arquivo, total_mensagens,
+                           sum(len(chaves) for chaves in blocos_chaves), total_limpo, nova=True, num_duplicadas=total_repetidas,
+                           periodo=(inicio, fim))
+        caminho_agregado = os.path.join(os.path.dirname(caminho_saida_arquivo), 'EnronEmailsAgregados.csv')
+        salvar_csv_agregado(caminho_agregado, indice_enderecos, df_agregado)
+
+    if verbose:
+        print(f"Mensagens repetidas descartadas: {total_repetidas}.")
+        print(f"Dados limpos (filtrados por data entre {inicio} e {fim}): {total_limpo} interações.")
+        print(f"Arquivo processado salvo em: {caminho_saida_arquivo}")
+        salvar_auditoria(os.path.dirname(caminho_saida_arquivo), auditoria)
+        if gravar_armazenamento:
+            print(f"Armazenamento binário de arestas salvo em: {caminho_armazenamento}")
+            print(f"Arestas agregadas ({len(df_agregado)} pares remetente -> destinatário) salvas em: {caminho_agregado}")
+
+        print("\n--- Pré-processamento concluído com sucesso!")
+
+    return total_mensagens
+
+def medir_desempenho(lista_workers, tamanho_chunk=TAMANHO_CHUNK_PADRAO, inicio=DATA_INICIO_PADRAO, fim=DATA_FIM_PADRAO):
+    #Benchmark simples: mede mensagens/segundo do pré-processamento para cada número de workers
+    #e confere se a saída de cada execução é idêntica (sha256) à da primeira.
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    root_dir = os.path.abspath(os.path.join(script_dir, '..', '..'))
+    caminho_entrada = os.path.join(root_dir, 'dataSets', 'Inputs', 'EnronEmails.csv')
+
+    print(f"--- Benchmark de pré-processamento ({caminho_entrada}) ---")
+
+    resultados = {}
+    hash_referencia = None
+    with tempfile.TemporaryDirectory() as dir_temp:
+        caminho_saida_temp = os.path.join(dir_temp, 'EnronEmailsTratados.csv')
+        for workers in lista_workers:
+            t0 = time.perf_counter()
+            total_mensagens = processar_dados_streaming(
+                caminho_entrada, caminho_saida_temp, inicio, fim, tamanho_chunk, workers,
+                verbose=False, gravar_armazenamento=False
+            )
+            duracao = time.perf_counter() - t0
+
+            if total_mensagens is None:
+                return resultados
+
+            resultados[workers] = total_mensagens / duracao
+            print(f"  {workers:>3} worker(s): {total_mensagens} mensagens em {duracao:.2f}s -> {resultados[workers]:.0f} mensagens/s")
+
+            hash_saida = hash_arquivo(caminho_saida_temp)
+            hash_referencia = hash_referencia or hash_saida
+            if hash_saida != hash_referencia:
+                print(f"ERRO: a saída com {workers} worker(s) difere da saída com {lista_workers[0]} worker(s).")
+
+    return resultados
+
 if __name__ == "__main__":
-    processar_dados()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Pré-processamento do dataset de e-mails da Enron.")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Lê o CSV bruto em blocos, mantendo o uso de memória constante.")
+    parser.add_argument('--tamanho-chunk', type=int, default=TAMANHO_CHUNK_PADRAO,
+                        help="Número de mensagens por bloco (shard) nos modos streaming e paralelo.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Número de processos; com N > 1 os blocos são processados em paralelo.")
+    parser.add_argument('--anexar', nargs='+', default=None, metavar='ARQUIVO',
+                        help="Anexa novas caixas postais (CSV bruto) ao corpus já processado, sem reprocessá-lo.")
+    parser.add_argument('--sobrescrever', action='store_true',
+                        help="Reprocessa o corpus mesmo que as saídas contenham caixas postais anexadas com --anexar.")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="Mede mensagens/s com 1, 2, 4 e N workers em vez de gerar a saída.")
+    parser.add_argument('--apelidos', default=None, metavar='JSON',
+                        help="Mapa de apelidos de endereços, ex.: {\"klay@enron.com\": \"kenneth.lay@enron.com\"}.")
+    parser.add_argument('--tipos-destinatario', nargs='+', default=list(TIPOS_DESTINATARIO), choices=list(TIPOS_DESTINATARIO),
+                        help="Campos de destinatário considerados como interações (padrão: to cc bcc).")
+    parser.add_argument('--inicio', default=None,
+                        help=f"Início do período do caso, ex.: 1999-01-01 (padrão: {DATA_INICIO_PADRAO}; com --anexar, o da última ingestão).")
+    parser.add_argument('--fim', default=None,
+                        help=f"Fim do período do caso (padrão: {DATA_FIM_PADRAO}; com --anexar, o da última ingestão).")
+    args = parser.parse_args()
+
+    try:
+        converter_periodo(args.inicio or DATA_INICIO_PADRAO, args.fim or DATA_FIM_PADRAO)
+    except ValueError:
+        parser.error("--inicio/--fim devem ser datas no formato AAAA-MM-DD.")
+
+    try:
+        apelidos = carregar_apelidos(args.apelidos)
+    except FileNotFoundError:
+        print(f"ERRO: Mapa de apelidos não encontrado em '{args.apelidos}'.")
+        raise SystemExit(1)
+    tipos = tuple(args.tipos_destinatario)
+
+    if args.anexar:
+        processar_dados_incremental(args.anexar, tamanho_chunk=args.tamanho_chunk, apelidos=apelidos, tipos=tipos,
+                                    inicio=args.inicio, fim=args.fim)
+    elif args.benchmark:
+        lista_workers = sorted({1, 2, 4, args.workers})
+        medir_desempenho(lista_workers, tamanho_chunk=args.tamanho_chunk,
+                         inicio=args.inicio or DATA_INICIO_PADRAO, fim=args.fim or DATA_FIM_PADRAO)
+    else:
+        processar_dados(streaming=args.streaming, tamanho_chunk=args.tamanho_chunk, workers=args.workers,
+                        apelidos=apelidos, tipos=tipos, inicio=args.inicio or DATA_INICIO_PADRAO, fim=args.fim or DATA_FIM_PADRAO,
+                        sobrescrever=args.sobrescrever)
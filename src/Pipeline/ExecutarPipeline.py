@@ -0,0 +1,292 @@
+import os
+import sys
+import json
+import time
+import shlex
+import hashlib
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+#Pipeline completo como um DAG de etapas:
+#  pre_processamento -> analise_estatica -> analise_disrupcao / plot_subgrafo / visualizador_grafo
+#(o visualizador lê comunidades_estaticas.json ao particionar por comunidade)
+#Cada etapa é identificada pelo hash do seu código, dos seus parâmetros e do conteúdo das suas
+#entradas; se nada mudou e as saídas registradas continuam intactas, a etapa é pulada.
+#Etapas independentes (cujas dependências já terminaram) rodam ao mesmo tempo.
+#Saídas do pré-processamento ampliadas por PreProcessamento.py --anexar são mantidas: a etapa não é
+#reexecutada a partir de EnronEmails.csv, o que descartaria as caixas postais anexadas.
+
+SAIDAS_PRE_PROCESSAMENTO = [
+    'dataSets/Outputs/EnronEmailsTratados.csv',
+    'dataSets/Outputs/EnronEmailsAgregados.csv',
+    'dataSets/Outputs/ArestasBinarias'
+]
+
+CODIGO_CARREGADOR = 'src/Analysis/CarregadorGrafo.py'
+
+ETAPAS = {
+    'pre_processamento': {
+        'script': 'src/DataTreatment/PreProcessamento.py',
+        'codigo': ['src/DataTreatment/PreProcessamento.py', 'src/DataTreatment/ArmazenamentoArestas.py'],
+        'depende_de': [],
+        'entradas': ['dataSets/Inputs/EnronEmails.csv'],
+        'saidas': SAIDAS_PRE_PROCESSAMENTO,
+        #Caixas postais anexadas com PreProcessamento.py --anexar alteram as saídas sem passar pelo pipeline
+        'historico_ingestoes': 'dataSets/Outputs/ArestasBinarias/ingestoes.json'
+    },
+    'analise_estatica': {
+        'script': 'src/Analysis/AnaliseEstatica.py',
+        'codigo': ['src/Analysis/AnaliseEstatica.py', 'src/Analysis/CentralidadeEsparsa.py',
+                   'src/Analysis/DeteccaoComunidades.py', CODIGO_CARREGADOR],
+        'depende_de': ['pre_processamento'],
+        'entradas': SAIDAS_PRE_PROCESSAMENTO,
+        'saidas': [
+            'dataSets/Outputs/centralidade_estatica.csv',
+            'dataSets/Outputs/top10_intermediarios.csv',
+            'dataSets/Outputs/top10_pagerank.csv',
+            'dataSets/Outputs/top10_closeness.csv',
+            'dataSets/Outputs/comunidades_estaticas.json',
+            'dataSets/Outputs/analise_comunidades.csv',
+            'dataSets/Outputs/top5_maiores_comunidades.csv'
+        ]
+    },
+    'analise_disrupcao': {
+        'script': 'src/Analysis/AnaliseDisrupcao.py',
+        'codigo': ['src/Analysis/AnaliseDisrupcao.py', CODIGO_CARREGADOR],
+        'depende_de': ['analise_estatica'],
+        'entradas': SAIDAS_PRE_PROCESSAMENTO + [
+            'dataSets/Outputs/top10_intermediarios.csv',
+            'dataSets/Outputs/top10_pagerank.csv'
+        ],
+        'saidas': ['dataSets/Outputs/analise_disrupcao.png']
+    },
+    'plot_subgrafo': {
+        'script': 'src/Analysis/PlotSubGrafo.py',
+        'codigo': ['src/Analysis/PlotSubGrafo.py', CODIGO_CARREGADOR],
+        'depende_de': ['analise_estatica'],
+        'entradas': SAIDAS_PRE_PROCESSAMENTO + [
+            'dataSets/Outputs/top10_intermediarios.csv',
+            'dataSets/Outputs/top10_pagerank.csv',
+            'dataSets/Outputs/top10_closeness.csv'
+        ],
+        'saidas': ['dataSets/Outputs/resumo_subgrafos.csv']
+    },
+    'visualizador_grafo': {
+        'script': 'src/Analysis/VisualizadorGrafo.py',
+        'codigo': ['src/Analysis/VisualizadorGrafo.py', CODIGO_CARREGADOR],
+        'depende_de': ['analise_estatica'],
+        'entradas': SAIDAS_PRE_PROCESSAMENTO + ['dataSets/Outputs/comunidades_estaticas.json'],
+        #Os arquivos gerados dependem de --formato e --particionar-por; o script os lista no manifesto
+        'saidas': ['dataSets/Outputs/visualizador_grafo_manifesto.json'],
+        'manifesto': 'dataSets/Outputs/visualizador_grafo_manifesto.json'
+    }
+}
+
+class RegistroHashes:
+    #Hash do conteúdo de arquivos e diretórios. O hash de cada arquivo é guardado junto com seu
+    #tamanho e data de modificação e só é recalculado quando um dos dois muda.
+    def __init__(self, root_dir, conhecidos=None):
+        self.root_dir = root_dir
+        self.conhecidos = conhecidos or {}
+
+    def _hash_arquivo(self, caminho_relativo):
+        caminho = os.path.join(self.root_dir, caminho_relativo)
+        info = os.stat(caminho)
+        registro = self.conhecidos.get(caminho_relativo)
+        if registro and registro[0] == info.st_size and registro[1] == info.st_mtime_ns:
+            return registro[2]
+
+        h = hashlib.sha256()
+        with open(caminho, 'rb') as f:
+            for bloco in iter(lambda: f.read(1 << 20), b''):
+                h.update(bloco)
+        self.conhecidos[caminho_relativo] = [info.st_size, info.st_mtime_ns, h.hexdigest()]
+        return h.hexdigest()
+
+    def hash(self, caminho_relativo):
+        #None quando o caminho não existe
+        caminho = os.path.join(self.root_dir, caminho_relativo)
+        if os.path.isfile(caminho):
+            return self._hash_arquivo(caminho_relativo)
+        if os.path.isdir(caminho):
+            h = hashlib.sha256()
+            for nome in sorted(os.listdir(caminho)):
+                h.update(nome.encode('utf-8'))
+                h.update(str(self.hash(os.path.join(caminho_relativo, nome))).encode('utf-8'))
+            return h.hexdigest()
+        return None
+
+def calcular_chave_etapa(registro, nome, etapa, argumentos):
+    h = hashlib.sha256()
+    h.update(nome.encode('utf-8'))
+    h.update(json.dumps(argumentos).encode('utf-8'))
+    for caminho in etapa['codigo'] + etapa['entradas']:
+        h.update(caminho.encode('utf-8'))
+        h.update(str(registro.hash(caminho)).encode('utf-8'))
+    return h.hexdigest()
+
+def listar_saidas(root_dir, etapa):
+    #Saídas fixas da etapa mais, quando houver, os arquivos listados no seu manifesto
+    saidas = list(etapa['saidas'])
+    if 'manifesto' in etapa:
+        try:
+            with open(os.path.join(root_dir, etapa['manifesto']), 'r', encoding='utf-8') as f:
+                saidas += [caminho for caminho in json.load(f) if caminho not in saidas]
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+    return saidas
+
+def saidas_intactas(registro, etapa, estado_etapa):
+    #As saídas devem existir e ter o mesmo conteúdo registrado na última execução
+    #(o manifesto faz parte das saídas, então os arquivos listados nele também são verificados)
+    saidas_registradas = estado_etapa.get('saidas', {})
+    return all(caminho in saidas_registradas for caminho in etapa['saidas']) and all(
+        registro.hash(caminho) == valor for caminho, valor in saidas_registradas.items()
+    )
+
+def ampliada_por_anexos(root_dir, etapa):
+    #As saídas foram alteradas por ingestões incrementais (--anexar) e não por uma falha: a etapa
+    #continua válida e não deve ser reexecutada, o que descartaria as caixas postais anexadas
+    if 'historico_ingestoes' not in etapa:
+        return False
+    if not all(os.path.exists(os.path.join(root_dir, caminho)) for caminho in etapa['saidas']):
+        return False
+    try:
+        with open(os.path.join(root_dir, etapa['historico_ingestoes']), 'r', encoding='utf-8') as f:
+            ingestoes = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+    return any(registro.get('modo') == 'incremental' for registro in ingestoes)
+
+def modificado_apos(caminho, instante):
+    #Diretórios contam como modificados quando todos os seus arquivos foram reescritos
+    if os.path.isdir(caminho):
+        arquivos = [os.path.join(caminho, nome) for nome in os.listdir(caminho)]
+        return bool(arquivos) and all(modificado_apos(arquivo, instante) for arquivo in arquivos)
+    return os.path.exists(caminho) and os.path.getmtime(caminho) >= instante
+
+def executar_etapa(root_dir, etapa, argumentos):
+    #Executa o script da etapa em um processo próprio; retorna (sucesso, saída do console, duração)
+    inicio = time.time()
+    resultado = subprocess.run(
+        [sys.executable, etapa['script']] + argumentos,
+        cwd=root_dir, capture_output=True, text=True
+    )
+    duracao = time.time() - inicio
+
+    #Scripts que encontram um erro imprimem a mensagem e terminam sem gerar as saídas,
+    #então o sucesso também exige que todas as saídas tenham sido (re)escritas nesta execução
+    saidas_geradas = all(modificado_apos(os.path.join(root_dir, caminho), inicio - 1) for caminho in listar_saidas(root_dir, etapa))
+    return resultado.returncode == 0 and saidas_geradas, resultado.stdout + resultado.stderr, duracao
+
+def executar_pipeline(argumentos_etapas=None, forcar=(), paralelas=4):
+    #argumentos_etapas: {etapa: [argumentos de linha de comando]}; entram no hash da etapa.
+    #forcar: etapas executadas mesmo que estejam em cache ('todas' força o pipeline inteiro).
+    #paralelas: número máximo de etapas executadas ao mesmo tempo.
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    root_dir = os.path.abspath(os.path.join(script_dir, '..', '..'))
+    caminho_estado = os.path.join(root_dir, 'dataSets', 'Outputs', 'cache', 'pipeline_estado.json')
+
+    argumentos_etapas = argumentos_etapas or {}
+    forcar = set(ETAPAS) if 'todas' in forcar else set(forcar)
+
+    try:
+        with open(caminho_estado, 'r') as f:
+            estado = json.load(f)
+    except FileNotFoundError:
+        estado = {'etapas': {}, 'arquivos': {}}
+
+    registro = RegistroHashes(root_dir, estado['arquivos'])
+
+    print(f"--- Iniciando o pipeline com {len(ETAPAS)} etapas (até {paralelas} em paralelo) ---")
+    inicio_pipeline = time.time()
+
+    situacao = {}
+    pendentes = list(ETAPAS)
+    em_execucao = {}
+
+    with ThreadPoolExecutor(max_workers=paralelas) as executor:
+        while pendentes or em_execucao:
+            #Dispara todas as etapas cujas dependências já terminaram
+            for nome in list(pendentes):
+                etapa = ETAPAS[nome]
+                dependencias = [situacao.get(dep) for dep in etapa['depende_de']]
+                if any(dep is None for dep in dependencias):
+                    continue
+                pendentes.remove(nome)
+
+                if any(dep == 'falhou' or dep == 'não executada' for dep in dependencias):
+                    situacao[nome] = 'não executada'
+                    print(f"[{nome}] não executada: uma dependência falhou.")
+                    continue
+
+                argumentos = argumentos_etapas.get(nome, [])
+                chave = calcular_chave_etapa(registro, nome, etapa, argumentos)
+                estado_etapa = estado['etapas'].get(nome, {})
+                if nome not in forcar and estado_etapa.get('chave') == chave and saidas_intactas(registro, etapa, estado_etapa):
+                    situacao[nome] = 'em cache'
+                    print(f"[{nome}] sem alterações, pulando (em cache).")
+                    continue
+                if nome not in forcar and estado_etapa.get('chave') == chave and ampliada_por_anexos(root_dir, etapa):
+                    #As etapas seguintes veem as saídas novas como entradas alteradas e são reexecutadas
+                    situacao[nome] = 'em cache'
+                    estado_etapa['saidas'] = {caminho: registro.hash(caminho) for caminho in listar_saidas(root_dir, etapa)}
+                    print(f"[{nome}] saídas ampliadas por ingestões incrementais (--anexar), pulando.")
+                    continue
+
+                print(f"[{nome}] executando: {etapa['script']} {' '.join(argumentos)}")
+                futuro = executor.submit(executar_etapa, root_dir, etapa, argumentos)
+                em_execucao[futuro] = (nome, chave)
+
+            if not em_execucao:
+                continue
+
+            concluidos, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+            for futuro in concluidos:
+                nome, chave = em_execucao.pop(futuro)
+                sucesso, saida, duracao = futuro.result()
+                print(f"\n[{nome}] saída do console:\n{saida}")
+                if sucesso:
+                    situacao[nome] = 'executada'
+                    estado['etapas'][nome] = {
+                        'chave': chave,
+                        'saidas': {caminho: registro.hash(caminho) for caminho in listar_saidas(root_dir, ETAPAS[nome])},
+                        'duracao_s': round(duracao, 2)
+                    }
+                    print(f"[{nome}] concluída em {duracao:.2f}s.")
+                else:
+                    situacao[nome] = 'falhou'
+                    estado['etapas'].pop(nome, None)
+                    print(f"[{nome}] FALHOU após {duracao:.2f}s.")
+
+    os.makedirs(os.path.dirname(caminho_estado), exist_ok=True)
+    with open(caminho_estado, 'w') as f:
+        json.dump(estado, f, indent=4)
+
+    print(f"\n--- Pipeline concluído em {time.time() - inicio_pipeline:.2f}s ---")
+    for nome in ETAPAS:
+        print(f"  {nome}: {situacao[nome]}")
+
+    return situacao
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Executa o pipeline completo, pulando as etapas que não mudaram.")
+    parser.add_argument('--argumentos', nargs=2, action='append', default=[], metavar=('ETAPA', 'ARGUMENTOS'),
+                        help="Argumentos repassados ao script de uma etapa, ex.: "
+                             "--argumentos analise_disrupcao \"--alvos-elite kenneth.lay@enron.com\".")
+    parser.add_argument('--forcar', nargs='+', default=[], choices=list(ETAPAS) + ['todas'],
+                        help="Etapas executadas mesmo sem alterações.")
+    parser.add_argument('--paralelas', type=int, default=4,
+                        help="Número máximo de etapas executadas ao mesmo tempo.")
+    args = parser.parse_args()
+
+    argumentos_etapas = {}
+    for nome, argumentos in args.argumentos:
+        if nome not in ETAPAS:
+            parser.error(f"etapa desconhecida: {nome}")
+        argumentos_etapas.setdefault(nome, []).extend(shlex.split(argumentos))
+
+    situacao = executar_pipeline(argumentos_etapas, args.forcar, args.paralelas)
+    if any(valor in ('falhou', 'não executada') for valor in situacao.values()):
+        raise SystemExit(1)